@@ -1,121 +1,38 @@
 import pandas as pd
-import re
-from collections import Counter
-from wordcloud import WordCloud
 import plotly
 import plotly.express as px
 import plotly.graph_objects as go
 import dash
 from dash import Dash, dcc, html
 from dash.dependencies import Input, Output, State
+from flask import Response, abort, jsonify, request
 import base64
-from io import BytesIO
+import json
 import os
 import pkg_resources
+import threading
 import gunicorn
+from preprocessing import video_urls
+from data_store import load_categories, memory_report
+from data_reloader import CategoryRegistry, DataReloader
+from wordcloud_cache import WordCloudCache
+from rollups import all_categories, build_rollups
+from term_stats import TermStats
+from background_jobs import create_manager, in_job_process, render_once
+from callbacks import register_style_toggle, register_windowed_graph_callback
+from callback_metrics import metrics_from_environment
 
 print("pandas version:", pd.__version__)
 print("wordcloud version:", pkg_resources.get_distribution("Wordcloud").version)
 print("plotly version:", plotly.__version__)
 print("dash version:", dash.__version__)
 
-stop_words = set([
-    'is', 'the', 'and', 'for', 'or', 'of', 'to', 'in', 'a', 'an', 'that', 'it', 'on', 'with', 'as', 'this', 'by', 'from', 'at', 'but', 'not',
-    'no', 'hashtags', '2024','5','w', 'too','vs','you','its','car','are','just','what','why','about','were','they'
-])
+# DATA_DIRECTORY points the dashboard at another set of dash_csv files, e.g. synthetic data for load tests
+data_directory = os.environ.get('DATA_DIRECTORY', os.path.join(os.path.dirname(__file__), 'data'))
 
-def preprocess_data(df):
-    print("Preprocessing data")
-    # Check if the necessary columns are present
-    required_columns = ['view_count', 'like_count', 'dislike_count', 'title', 'hashtags', 'channel', 'video_url', 'subscriber_count', 'description', 'duration']
-    for column in required_columns:
-        if column not in df.columns:
-            print(f"Error: Column '{column}' not found in DataFrame")
-            return None
-    
-    df['view_count'] = df['view_count'].fillna(0).astype(int)
-    df['like_count'] = df['like_count'].fillna(0).astype(int)
-    df['dislike_count'] = df['dislike_count'].fillna(0).astype(int)
-    df['subscriber_count'] = df['subscriber_count'].fillna(0).astype(int)
-    
-    # Convert duration to total minutes
-    def convert_duration(duration):
-        try:
-            minutes, seconds = map(int, duration.split(':'))
-            return minutes + seconds / 60
-        except:
-            return 0  # Handle cases where the duration is not in the expected format
-
-    df['duration'] = df['duration'].fillna('0:00').apply(convert_duration)
-    
-    # Aggregate by video title, summing views and averaging duration
-    agg_df = df.groupby('title').agg({
-        'view_count': 'sum',
-        'like_count': 'sum',
-        'dislike_count': 'sum',
-        'duration': 'mean',
-        'hashtags': 'first',
-        'channel': 'first',
-        'video_url': 'first',
-        'subscriber_count': 'first',
-        'description': 'first'
-    }).reset_index()
-    
-    agg_df['Total Interactions'] = agg_df['view_count'] + agg_df['like_count'] + agg_df['dislike_count']
-    # Add 'Net Likes' column
-    agg_df['Net Likes'] = agg_df['like_count'] - agg_df['dislike_count']
-    # Drop duplicate entries for users based on the highest subscriber count
-    agg_df = agg_df.sort_values(by='subscriber_count', ascending=False).drop_duplicates(subset='channel', keep='first')
-    
-    # Categorize duration into 3-minute intervals
-    bins = range(0, int(agg_df['duration'].max()) + 3, 3)
-    labels = [f'{i}-{i+3}' for i in bins[:-1]]
-    agg_df['duration_category'] = pd.cut(agg_df['duration'], bins=bins, labels=labels, right=False, ordered=True)
-    
-    # Aggregate the view counts by duration intervals
-    duration_view_counts = agg_df.groupby('duration_category')['view_count'].sum().reset_index()
-    
-    return agg_df, duration_view_counts
-
-data_directory = os.path.join(os.path.dirname(__file__), 'data')
-
-# Read the preprocessed CSV files from the data directory
-categories = {
-    'sports': preprocess_data(pd.read_csv(os.path.join(data_directory, 'dash_csv_sports.csv'))),
-    'health': preprocess_data(pd.read_csv(os.path.join(data_directory, 'dash_csv_health.csv'))),
-    'entertainment': preprocess_data(pd.read_csv(os.path.join(data_directory, 'dash_csv_entertainment.csv'))),
-    'education': preprocess_data(pd.read_csv(os.path.join(data_directory, 'dash_csv_education.csv'))),
-    'automotive': preprocess_data(pd.read_csv(os.path.join(data_directory, 'dash_csv_automotive.csv'))),
-    'business': preprocess_data(pd.read_csv(os.path.join(data_directory, 'dash_csv_business.csv'))),
-    'news': preprocess_data(pd.read_csv(os.path.join(data_directory, 'dash_csv_news.csv')))
-}
-
-categories = {k: v for k, v in categories.items() if v is not None}
-
-def calculate_word_frequencies(titles):
-    all_titles = ' '.join(titles.dropna().tolist())
-    all_titles = re.sub(r'[^\w\s]', '', all_titles).lower()
-    words = all_titles.split()
-    words = [word for word in words if word not in stop_words]
-    word_freq = Counter(words)
-    return word_freq
-
-def generate_wordcloud_image(word_freq, most_common_word):
-    def color_func(word, *args, **kwargs):
-        return 'red' if word == most_common_word else 'white'
-
-    wordcloud = WordCloud(
-        width=1600,  
-        height=800,  
-        background_color='rgba(0,0,0,0)',  
-        mode='RGBA',  
-        color_func=color_func
-    ).generate_from_frequencies(word_freq)
-    
-    img = BytesIO()
-    wordcloud.to_image().save(img, format='PNG')
-    img.seek(0)
-    return base64.b64encode(img.getvalue()).decode()
+# Load every category from the columnar store, falling back to the CSV files when the store is missing or stale.
+# The registry swaps in categories reloaded in the background without restarting the server.
+registry = CategoryRegistry(load_categories(data_directory))
 
 def get_logo_base64(logo_path):
     with open(logo_path, 'rb') as f:
@@ -136,6 +53,31 @@ app = Dash(__name__, external_stylesheets=[
 
 server = app.server
 
+# Callback timings, payload sizes and category hits of this worker, served at /metrics.
+# CALLBACK_PROFILE_MS=<ms> also dumps sampled stacks of callbacks slower than that.
+metrics = metrics_from_environment(script_dir)
+
+@server.route('/metrics')
+def callback_metrics():
+    return jsonify(metrics.summary())
+
+# Rendered word clouds are shared by all workers through the disk tier and served as static
+# images, so Trends responses carry a short URL instead of a multi-megabyte base64 string
+# The directory is capped at WORDCLOUD_CACHE_MAX_MB, least recently used images are pruned first
+wordcloud_cache = WordCloudCache(os.environ.get('WORDCLOUD_CACHE_DIR', os.path.join(script_dir, 'cache', 'wordclouds')),
+                                 max_disk_bytes=int(float(os.environ.get('WORDCLOUD_CACHE_MAX_MB', '200')) * 2 ** 20))
+
+@server.route('/wordclouds/<digest>.png')
+def serve_wordcloud(digest):
+    png = wordcloud_cache.get_png(digest) if digest.isalnum() else None
+    if png is None:
+        abort(404)
+    # The URL is derived from the image inputs, so the image behind it never changes
+    return Response(png, mimetype='image/png', headers={'Cache-Control': 'public, max-age=31536000, immutable'})
+
+# Steps reported to the progress bar while a Trends view renders in the background
+trends_render_steps = 3
+
 app.layout = html.Div(style={'backgroundColor': '#121212', 'color': 'white', 'padding': '20px', 'max-width': '100vw', 'overflow-x': 'hidden'}, children=[
     html.Div(style={'display': 'flex', 'alignItems': 'center', 'justifyContent': 'center', 'width': '100%'}, children=[
         html.Img(src=f'data:image/png;base64,{logo_base64}', style={'height': '150px', 'marginRight': '20px'}),
@@ -153,13 +95,31 @@ app.layout = html.Div(style={'backgroundColor': '#121212', 'color': 'white', 'pa
                 className='black-searchbox roboto-light',
                 style={'width': '300px', 'color': '#ffffff', 'marginRight': '10px'}
             ),
-            html.Button('Search', id='search-button', n_clicks=0, className='black-searchbox roboto-light', style={'color': '#ffffff'})
+            html.Button('Search', id='search-button', n_clicks=0, className='black-searchbox roboto-light', style={'color': '#ffffff'}),
+            dcc.RadioItems(
+                id='search-mode',
+                options=[
+                    {'label': 'Keywords', 'value': 'keywords'},
+                    {'label': 'Substring', 'value': 'substring'}
+                ],
+                value='keywords',
+                inline=True,
+                className='roboto-light',
+                style={'marginLeft': '10px'},
+                inputStyle={'marginLeft': '10px', 'marginRight': '5px'}
+            ),
+            dcc.Store(id='search-page', data=0),
+            dcc.Store(id='search-page-count', data=0),
+            dcc.Store(id='search-rendered'),
+            dcc.Store(id='engagement-rendered'),
+            dcc.Store(id='trends-rendered'),
+            dcc.Store(id='trends-request')
         ], style={'display': 'flex', 'alignItems': 'center', 'marginBottom': '20px', 'flex': '1'}),
         html.Div([
             html.Label("Category of Media", className='roboto-light', style={'marginRight': '5px'}),
             dcc.Dropdown(
                 id='category-dropdown',
-                options=[{'label': cat.capitalize(), 'value': cat} for cat in categories.keys()],
+                options=[{'label': cat.capitalize(), 'value': cat} for cat in registry.categories.keys()] + [{'label': 'All categories', 'value': all_categories}],
                 value='entertainment',
                 clearable=False,
                 className='black-dropdown roboto-light',
@@ -180,6 +140,10 @@ app.layout = html.Div(style={'backgroundColor': '#121212', 'color': 'white', 'pa
         ], style={'display': 'flex', 'alignItems': 'center', 'justifyContent': 'flex-end', 'marginBottom': '20px', 'flex': '1'})
     ], style={'display': 'flex', 'alignItems': 'center', 'justifyContent': 'space-between', 'width': '100%', 'max-width': '100%'}),
     html.Div(id='search-results', style={'marginTop': '20px', 'width': '100%', 'color': 'white'}),
+    html.Div(id='search-pagination', style={'display': 'none'}, children=[
+        html.Button('Previous', id='search-prev', n_clicks=0, className='black-searchbox roboto-light', style={'color': '#ffffff'}),
+        html.Button('Next', id='search-next', n_clicks=0, className='black-searchbox roboto-light', style={'color': '#ffffff'})
+    ]),
     html.Div(id='graphs-container', className='roboto-light', children=[
         html.Div([
             dcc.Graph(id='bar-chart', style={'display': 'none', 'width': '75%', 'max-width': '100vw'}),
@@ -190,243 +154,665 @@ app.layout = html.Div(style={'backgroundColor': '#121212', 'color': 'white', 'pa
             dcc.Graph(id='dot-dislike-chart', style={'display': 'none', 'width': '75%', 'max-width': '100vw'}),
         ], className='graph-container', style={'width': '100%'}),
         html.Div([
+            html.Div(id='trends-status', className='roboto-light', style={'display': 'none'}, children=[
+                html.P("Rendering Trends..."),
+                html.Progress(id='trends-progress', value='0', max=str(trends_render_steps))
+            ]),
             html.Div(id='wordcloud-container', style={'display': 'none', 'margin': 'auto', 'width': '100%', 'height': '100px', 'max-width': '100vw'}),
-            dcc.Graph(id='line-graph', style={'display': 'none', 'width': '75%', 'max-width': '100vw', 'height': '500px'})
+            dcc.Graph(id='line-graph', style={'display': 'none', 'width': '75%', 'max-width': '100vw', 'height': '500px'}),
+            html.Div(id='line-graph-params', style={'display': 'none'}),
+            html.Div(id='line-graph-message', className='roboto-light', style={'display': 'none'})
         ], className='graph-container', style={'width': '100%'}),
     ], style={'width': '100%', 'padding': '10px', 'boxSizing': 'border-box', 'overflow': 'hidden'}),
     html.Div(id='additional-graphs', style={'marginTop': '20px', 'width': '100%'}, className='roboto-light')
 ])
 
-@app.callback(
-    [Output('bar-chart', 'figure'),
-     Output('subscriber-chart', 'figure'),
-     Output('dot-like-chart', 'figure'),
-     Output('dot-dislike-chart', 'figure'),
-     Output('wordcloud-container', 'children'),
-     Output('bar-chart', 'style'),
-     Output('subscriber-chart', 'style'),
-     Output('dot-like-chart', 'style'),
-     Output('dot-dislike-chart', 'style'),
-     Output('wordcloud-container', 'style'),
-     Output('additional-graphs', 'children'),
-     Output('line-graph', 'figure'),
-     Output('line-graph', 'style'),
-     Output('search-results', 'children')],
-    [Input('category-dropdown', 'value'), 
-     Input('sort-dropdown', 'value'), 
-     Input('search-button', 'n_clicks')],
-    [State('search-input', 'value')]
-)
-def update_visualizations(selected_category, sort_by, n_clicks, search_value):
-    print(f"Selected category: {selected_category}, sort by: {sort_by}")
-    data, duration_view_counts = categories[selected_category]
-    print(data.head())
-
-    wordcloud_container = ''
-    wordcloud_container_style = {'display': 'none'}
-    fig = go.Figure()
-    subscriber_fig = go.Figure()
-    dot_like_fig = go.Figure()
-    dot_dislike_fig = go.Figure()
-    line_fig = go.Figure()
-    additional_graphs_content = []
-    bar_chart_style = {'display': 'none'}
-    subscriber_chart_style = {'display': 'none'}
-    dot_like_chart_style = {'display': 'none'}
-    dot_dislike_chart_style = {'display': 'none'}
-    wordcloud_container_style = {'display': 'none'}
-    line_graph_style = {'display': 'none'}
-    search_results_content = []
-
-    if sort_by == 'Trends':
-        if not data.empty:
-            # Ensure correct order of categories
-            categories_order = ['0-3', '3-6', '6-9', '9-12', '12-15', '15-18', '18-21', '21-24', '24-27', '27-30', '30-33', '33-36', '36-39']
-            duration_view_counts['duration_category'] = pd.Categorical(duration_view_counts['duration_category'], categories=categories_order, ordered=True)
-            duration_view_counts = duration_view_counts.dropna(subset=['duration_category'])
-            
-            # Create area chart for total view count by video duration intervals
-            area_fig = px.area(duration_view_counts, x='duration_category', y='view_count', category_orders={'duration_category': categories_order})
-            area_fig.update_traces(line=dict(color='grey'))
-            area_fig.update_layout(
-                xaxis=dict(title='Video Duration (minutes)', showgrid=False),
-                yaxis=dict(title='View Count', showgrid=False),
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white'),
-                title=dict(
-                    text='View Count vs. Video Duration',
-                    font=dict(family='Anton', size=24),
-                    x=0.5,
-                    xanchor='center'
-                )
+# Figures only depend on the category, the analysis type and the loaded data, so they are
+# built once per (category, analysis type, category data version) and served from this cache.
+analysis_types = ['Engagement Metrics', 'Trends']
+view_model_cache = {}
+
+# Plotly Express is not thread-safe, and figures are built on request threads, the warm-up
+# thread and the reloader thread, so every builder constructs its figures under this lock.
+figure_lock = threading.RLock()
+# Lock per view model key being built, so a request waits for a build already in flight
+view_model_builds = {}
+view_model_builds_lock = threading.Lock()
+
+def empty_view_model():
+    return {
+        'bar_fig': go.Figure().to_dict(),
+        'subscriber_fig': go.Figure().to_dict(),
+        'dot_like_fig': go.Figure().to_dict(),
+        'dot_dislike_fig': go.Figure().to_dict(),
+        'wordcloud_container': '',
+        'additional_graphs_content': [],
+        'line_fig': go.Figure().to_dict(),
+        'line_message': '',
+        'liked_users': None
+    }
+
+def build_trends_view(data, duration_view_counts, term_stats, progress=None):
+    view_model = empty_view_model()
+    if data.empty:
+        return view_model
+
+    # Ensure correct order of categories
+    categories_order = ['0-3', '3-6', '6-9', '9-12', '12-15', '15-18', '18-21', '21-24', '24-27', '27-30', '30-33', '33-36', '36-39']
+    duration_view_counts = duration_view_counts.copy()
+    duration_view_counts['duration_category'] = pd.Categorical(duration_view_counts['duration_category'], categories=categories_order, ordered=True)
+    duration_view_counts = duration_view_counts.dropna(subset=['duration_category'])
+
+    with figure_lock:
+        # Create area chart for total view count by video duration intervals
+        area_fig = px.area(duration_view_counts, x='duration_category', y='view_count', category_orders={'duration_category': categories_order})
+        area_fig.update_traces(line=dict(color='grey'))
+        area_fig.update_layout(
+            xaxis=dict(title='Video Duration (minutes)', showgrid=False),
+            yaxis=dict(title='View Count', showgrid=False),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='white'),
+            title=dict(
+                text='View Count vs. Video Duration',
+                font=dict(family='Anton', size=24),
+                x=0.5,
+                xanchor='center'
             )
-            additional_graphs_content = [dcc.Graph(figure=area_fig)]
-
-            # Word count
-            word_freq = calculate_word_frequencies(data['title'])
-            most_common_word = word_freq.most_common(1)[0][0]
-
-            # Generate word cloud image
-            wordcloud_src = f'data:image/png;base64,{generate_wordcloud_image(word_freq, most_common_word)}'
-            wordcloud_container = html.Div(children=[
-                html.Img(src=wordcloud_src, style={'display': 'block', 'max-width': '100%', 'height': 'auto', 'margin': '0 auto'})
-            ], style={'display': 'block', 'text-align': 'center', 'margin': '0 auto'})
-            wordcloud_container_style = {'display': 'flex', 'justify-content': 'center', 'align-items': 'center', 'margin': '20px auto', 'width': '0%', 'height': '400px'}
-
-    else:
-        if not data.empty:
-            fig = px.bar(data.sort_values(by='Total Interactions', ascending=False).head(10),
-                         x='Total Interactions', y='channel', orientation='h', title='Top 10 Users by Total Interactions', template="plotly_dark",
-                         color_discrete_sequence=['red'])
-            subscriber_fig = px.bar(data.sort_values(by='subscriber_count', ascending=False).head(10),
-                                    x='subscriber_count', y='channel', orientation='h', title='Top 10 Users by Subscriber Count', template="plotly_dark",
-                                    color_discrete_sequence=['blue'])
-            dot_like_fig = px.scatter(data.sort_values(by='like_count', ascending=False).head(10), x='like_count', y='channel', size='like_count', title='Top 10 Users by Like Counts', 
-                                      template="plotly_dark", color_discrete_sequence=['red'], size_max=20)
-            dot_dislike_fig = px.scatter(data.sort_values(by='dislike_count', ascending=False).head(10),
-                                         x='dislike_count', y='channel', size='dislike_count', title='Top 10 Users by Dislike Counts', 
-                                         template="plotly_dark", color_discrete_sequence=['red'], size_max=20)
-            fig.update_traces(marker=dict(color='red'), width=0.6) 
+        )
+        view_model['additional_graphs_content'] = [dcc.Graph(figure=area_fig.to_dict())] + build_term_graphs(term_stats)
+
+    if progress:
+        progress(1)
+
+    with metrics.stage('wordcloud'):
+        # Word counts are precomputed per category, see term_stats.py
+        word_freq = term_stats.word_frequencies()
+        most_common_word = term_stats.top_terms(1).index[0]
+        if progress:
+            progress(2)
+
+        # Generate word cloud image, or reuse one another request or worker already rendered
+        wordcloud_src = f'/wordclouds/{wordcloud_cache.get_or_render(word_freq, most_common_word)}.png'
+    if progress:
+        progress(3)
+    view_model['wordcloud_container'] = html.Div(children=[
+        html.Img(src=wordcloud_src, style={'display': 'block', 'max-width': '100%', 'height': 'auto', 'margin': '0 auto'})
+    ], style={'display': 'block', 'text-align': 'center', 'margin': '0 auto'})
+    return view_model
+
+top_terms_count = 15
+
+def build_term_graphs(term_stats):
+    # Top hashtags and the title terms whose videos were watched most
+    graphs = []
+    for table, y, title, label in ((term_stats.top_hashtags(top_terms_count), 'videos', 'Top Hashtags', 'Videos'),
+                                   (term_stats.top_terms(top_terms_count, by='views'), 'views', 'Title Terms by Total Views', 'Total Views')):
+        if table.empty:
+            continue
+        with figure_lock:
+            fig = px.bar(table.reset_index(), x='term', y=y, hover_data=['count', 'videos', 'views'], template="plotly_dark")
+            fig.update_traces(marker_color='grey')
             fig.update_layout(
-                showlegend=False,
+                xaxis=dict(title='', showgrid=False),
+                yaxis=dict(title=label, showgrid=False),
                 plot_bgcolor='rgba(0,0,0,0)',
                 paper_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(showgrid=False, zeroline=False, title=''),
-                yaxis=dict(showgrid=False, zeroline=False, title=''),
-                title=dict(
-                    text='Top 10 Channels by Total Interactions',
-                    font=dict(family='Anton', size=24),
-                    x=0.5,
-                    xanchor='center'
-                ),
-                hoverlabel=dict(
-                    bgcolor="rgba(0, 0, 0, 0.7)",  # Black background with 70% opacity
-                    font_size=16,
-                    font_family="Rockwell",
-                    font_color="white"  # White font color
-                )
+                font=dict(color='white'),
+                title=dict(text=title, font=dict(family='Anton', size=24), x=0.5, xanchor='center')
             )
-            subscriber_fig.update_traces(marker=dict(color='red'), width=0.6)
-            subscriber_fig.update_layout(
-                showlegend=False,
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(showgrid=False, zeroline=False, title=''),
-                yaxis=dict(showgrid=False, zeroline=False, title=''),
+            graphs.append(dcc.Graph(figure=fig.to_dict()))
+    return graphs
+
+# The Net Likes line graph only sends a window of channels (plus one "Others" point summing
+# the rest) and fetches the next window when the user pans or zooms out, see callbacks.py
+line_window_size = 50
+max_line_points = 200
+
+def build_line_window(liked_users, start, end):
+    total = len(liked_users)
+    start = max(0, min(start, total - 1))
+    end = max(start + 1, min(end, total))
+    # Downsample windows wider than max_line_points by keeping every stride-th channel
+    stride = max(1, -(-(end - start) // max_line_points))
+    window = liked_users.iloc[start:end:stride]
+    outside = total - (end - start)
+    points = window
+    if outside > 0:
+        others = liked_users['Net Likes'].sum() - liked_users['Net Likes'].iloc[start:end].sum()
+        points = pd.concat([window, pd.DataFrame({'channel': [f'Others ({outside} channels)'], 'Net Likes': [others]})], ignore_index=True)
+    # Relayouts build this on request threads while the warm-up and reloader threads build views
+    with figure_lock:
+        line_fig = px.line(points, x='channel', y='Net Likes', title='Channel Popularity by Net Like', template="plotly_dark")
+        line_fig.update_layout(
+            yaxis=dict(
                 title=dict(
-                    text='Top 10 Channels by Subscriber Count',
-                    font=dict(family='Anton', size=24),
-                    x=0.5,
-                    xanchor='center'
+                    text='Net Like Count',
+                    font=dict(family='Anton', size=18),
                 ),
-                hoverlabel=dict(
-                    bgcolor="rgba(0, 0, 0, 0.7)",  # Black background with 70% opacity
-                    font_size=16,
-                    font_family="Rockwell",
-                    font_color="white"  # White font color
-                )
-            )
-            dot_like_fig.update_layout(
-                showlegend=False,
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(showgrid=False, zeroline=False, title=''),
-                yaxis=dict(showgrid=False, zeroline=False, title=''),
+                showgrid=False,  
+                zeroline=False 
+            ),
+            xaxis=dict(
                 title=dict(
-                    text='Top 10 Users by Like Counts',
-                    font=dict(family='Anton', size=24),
-                    x=0.5,
-                    xanchor='center'
+                    text='Channel',
+                    font=dict(family='Anton', size=18),
                 ),
-                hoverlabel=dict(
-                    bgcolor="rgba(0, 0, 0, 0.7)",  # Black background with 70% opacity
-                    font_size=16,
-                    font_family="Rockwell",
-                    font_color="white"  # White font color
-                )
+                showgrid=False,  
+                zeroline=False  
+            ),
+            title=dict(
+                text='Channel Popularity by Net Like',
+                font=dict(family='Anton', size=24),
+                x=0.5,
+                xanchor='center'
+            ),
+            plot_bgcolor='rgba(0,0,0,0)',  
+            paper_bgcolor='rgba(0,0,0,0)',
+            hoverlabel=dict(
+                bgcolor="rgba(0, 0, 0, 0.7)",  # Black background with 70% opacity
+                font_size=16,
+                font_family="Rockwell",
+                font_color="white"  # White font color
             )
-            dot_dislike_fig.update_layout(
-                showlegend=False,
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(showgrid=False, zeroline=False, title=''),
-                yaxis=dict(showgrid=False, zeroline=False, title=''),
-                title=dict(
-                    text='Top 10 Users by Dislike Counts',
-                    font=dict(family='Anton', size=24),
-                    x=0.5,
-                    xanchor='center'
-                ),
-                hoverlabel=dict(
-                    bgcolor="rgba(0, 0, 0, 0.7)",  # Black background with 70% opacity
-                    font_size=16,
-                    font_family="Rockwell",
-                    font_color="white"  # White font color
-                )
+        )
+        line_fig.update_layout(meta={'start': start, 'end': end, 'stride': stride, 'points': len(window), 'total': total})
+        figure = line_fig.to_dict()
+    message = f"Channels {start + 1}-{end} of {total}" + (f", 1 in {stride} shown" if stride > 1 else '')
+    return figure, message
+
+def build_engagement_view(data):
+    view_model = empty_view_model()
+    if data.empty:
+        return view_model
+
+    with metrics.stage('top_n'):
+        top_interactions = data.nlargest(10, 'Total Interactions')
+        top_subscribers = data.nlargest(10, 'subscriber_count')
+        top_likes = data.nlargest(10, 'like_count')
+        top_dislikes = data.nlargest(10, 'dislike_count')
+
+    with figure_lock:
+        fig = px.bar(top_interactions,
+                     x='Total Interactions', y='channel', orientation='h', title='Top 10 Users by Total Interactions', template="plotly_dark",
+                     color_discrete_sequence=['red'])
+        subscriber_fig = px.bar(top_subscribers,
+                                x='subscriber_count', y='channel', orientation='h', title='Top 10 Users by Subscriber Count', template="plotly_dark",
+                                color_discrete_sequence=['blue'])
+        dot_like_fig = px.scatter(top_likes, x='like_count', y='channel', size='like_count', title='Top 10 Users by Like Counts', 
+                                  template="plotly_dark", color_discrete_sequence=['red'], size_max=20)
+        dot_dislike_fig = px.scatter(top_dislikes,
+                                     x='dislike_count', y='channel', size='dislike_count', title='Top 10 Users by Dislike Counts', 
+                                     template="plotly_dark", color_discrete_sequence=['red'], size_max=20)
+        fig.update_traces(marker=dict(color='red'), width=0.6) 
+        fig.update_layout(
+            showlegend=False,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            xaxis=dict(showgrid=False, zeroline=False, title=''),
+            yaxis=dict(showgrid=False, zeroline=False, title=''),
+            title=dict(
+                text='Top 10 Channels by Total Interactions',
+                font=dict(family='Anton', size=24),
+                x=0.5,
+                xanchor='center'
+            ),
+            hoverlabel=dict(
+                bgcolor="rgba(0, 0, 0, 0.7)",  # Black background with 70% opacity
+                font_size=16,
+                font_family="Rockwell",
+                font_color="white"  # White font color
             )
-            bar_chart_style = {'width': '75%', 'display': 'inline-block', 'vertical-align': 'top', 'margin-bottom': '20px', 'boxSizing': 'border-box', 'padding': '10px'}
-            subscriber_chart_style = {'width': '75%', 'display': 'inline-block', 'vertical-align': 'top', 'margin-bottom': '20px', 'boxSizing': 'border-box', 'padding': '10px'}
-            dot_like_chart_style = {'width': '75%', 'display': 'inline-block', 'vertical-align': 'top', 'margin-bottom': '20px', 'boxSizing': 'border-box', 'padding': '10px'}
-            dot_dislike_chart_style = {'width': '75%', 'display': 'inline-block', 'vertical-align': 'top', 'margin-bottom': '20px', 'boxSizing': 'border-box', 'padding': '10px'}
-            liked_users = data.groupby('channel')['Net Likes'].sum().reset_index()
-            liked_users = liked_users.sort_values(by='Net Likes', ascending=False)
-            line_fig = px.line(liked_users, x='channel', y='Net Likes', title='Channel Popularity by Net Like', template="plotly_dark")
-            line_fig.update_layout(
-                yaxis=dict(
-                    title=dict(
-                        text='Net Like Count',
-                        font=dict(family='Anton', size=18),
-                    ),
-                    showgrid=False,  
-                    zeroline=False 
-                ),
-                xaxis=dict(
-                    title=dict(
-                        text='Channel',
-                        font=dict(family='Anton', size=18),
-                    ),
-                    showgrid=False,  
-                    zeroline=False  
-                ),
-                title=dict(
-                    text='Channel Popularity by Net Like',
-                    font=dict(family='Anton', size=24),
-                    x=0.5,
-                    xanchor='center'
-                ),
-                plot_bgcolor='rgba(0,0,0,0)',  
-                paper_bgcolor='rgba(0,0,0,0)',
-                hoverlabel=dict(
-                    bgcolor="rgba(0, 0, 0, 0.7)",  # Black background with 70% opacity
-                    font_size=16,
-                    font_family="Rockwell",
-                    font_color="white"  # White font color
-                )
+        )
+        subscriber_fig.update_traces(marker=dict(color='red'), width=0.6)
+        subscriber_fig.update_layout(
+            showlegend=False,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            xaxis=dict(showgrid=False, zeroline=False, title=''),
+            yaxis=dict(showgrid=False, zeroline=False, title=''),
+            title=dict(
+                text='Top 10 Channels by Subscriber Count',
+                font=dict(family='Anton', size=24),
+                x=0.5,
+                xanchor='center'
+            ),
+            hoverlabel=dict(
+                bgcolor="rgba(0, 0, 0, 0.7)",  # Black background with 70% opacity
+                font_size=16,
+                font_family="Rockwell",
+                font_color="white"  # White font color
             )
-            line_graph_style = {'display': 'block', 'margin-top': '20px', 'width': '95%', 'height': '500px'}
-            
-    if search_value:
-        search_results = data[data['title'].str.contains(search_value, case=False, na=False) | data['description'].str.contains(search_value, case=False, na=False)]
-        if not search_results.empty:
-            search_results_content = html.Div([
-                html.H4("Relevant Posts:", style={'fontFamily': 'Roboto', 'textAlign': 'center'}),
-                html.Ul([html.Li([
-                    html.P(f"Title: {row['title']}"),
-                    html.P(f"Channel: {row['channel']}"),
-                    html.A("Watch Video", href=row['video_url'], target="_blank")
-                ]) for index, row in search_results.iterrows()])
-            ], style={'marginTop': '20px'})
+        )
+        dot_like_fig.update_layout(
+            showlegend=False,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            xaxis=dict(showgrid=False, zeroline=False, title=''),
+            yaxis=dict(showgrid=False, zeroline=False, title=''),
+            title=dict(
+                text='Top 10 Users by Like Counts',
+                font=dict(family='Anton', size=24),
+                x=0.5,
+                xanchor='center'
+            ),
+            hoverlabel=dict(
+                bgcolor="rgba(0, 0, 0, 0.7)",  # Black background with 70% opacity
+                font_size=16,
+                font_family="Rockwell",
+                font_color="white"  # White font color
+            )
+        )
+        dot_dislike_fig.update_layout(
+            showlegend=False,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            xaxis=dict(showgrid=False, zeroline=False, title=''),
+            yaxis=dict(showgrid=False, zeroline=False, title=''),
+            title=dict(
+                text='Top 10 Users by Dislike Counts',
+                font=dict(family='Anton', size=24),
+                x=0.5,
+                xanchor='center'
+            ),
+            hoverlabel=dict(
+                bgcolor="rgba(0, 0, 0, 0.7)",  # Black background with 70% opacity
+                font_size=16,
+                font_family="Rockwell",
+                font_color="white"  # White font color
+            )
+        )
+        view_model['bar_fig'] = fig.to_dict()
+        view_model['subscriber_fig'] = subscriber_fig.to_dict()
+        view_model['dot_like_fig'] = dot_like_fig.to_dict()
+        view_model['dot_dislike_fig'] = dot_dislike_fig.to_dict()
+
+    with metrics.stage('top_n'):
+        liked_users = data.groupby('channel', observed=True)['Net Likes'].sum().reset_index()
+        liked_users = liked_users.sort_values(by='Net Likes', ascending=False, kind='stable').reset_index(drop=True)
+    view_model['liked_users'] = liked_users
+    view_model['line_fig'], view_model['line_message'] = build_line_window(liked_users, 0, line_window_size)
+    return view_model
+
+# "All categories" is served from rollups of one combined dataset, rebuilt once per data version
+rollups_cache = {}
+
+def get_rollups(snapshot):
+    rollups = rollups_cache.get('current')
+    if rollups is None or rollups.version != snapshot.version:
+        rollups = build_rollups(snapshot.categories, snapshot.version)
+        rollups_cache['current'] = rollups
+    return rollups
+
+# Title-term and hashtag counts per category. A reloaded category is counted from the rows
+# that changed since the version cached here rather than from scratch.
+term_stats_cache = {}
+
+def get_term_stats(snapshot, selected_category):
+    if selected_category == all_categories:
+        cached = term_stats_cache.get(all_categories)
+        if cached is None or cached[0] != snapshot.version:
+            cached = (snapshot.version, TermStats.combine(get_term_stats(snapshot, category) for category in snapshot.categories))
+            term_stats_cache[all_categories] = cached
+        return cached[1]
+    version = snapshot.category_versions[selected_category]
+    cached = term_stats_cache.get(selected_category)
+    if cached is None or cached[0] != version:
+        data = snapshot.categories[selected_category][0]
+        cached = (version, cached[1].update(data) if cached else TermStats.from_frame(data))
+        term_stats_cache[selected_category] = cached
+    return cached[1]
+
+def category_version(snapshot, selected_category):
+    # The combined view changes whenever any category does
+    if selected_category == all_categories:
+        return snapshot.version
+    return snapshot.category_versions[selected_category]
+
+def view_inputs(snapshot, selected_category, sort_by):
+    # (data, duration_view_counts) a view is built from
+    if selected_category == all_categories:
+        rollups = get_rollups(snapshot)
+        # Engagement charts rank channels by their totals over all categories
+        return (rollups.combined if sort_by == 'Trends' else rollups.channel_totals), rollups.duration_totals
+    data, duration_view_counts, search_index = snapshot.categories[selected_category]
+    return data, duration_view_counts
+
+def get_view_model(selected_category, sort_by, snapshot=None, progress=None):
+    snapshot = snapshot or registry.snapshot()
+    key = (selected_category, sort_by, category_version(snapshot, selected_category))
+    view_model = view_model_cache.get(key)
+    if view_model is not None:
+        return view_model
+    with view_model_builds_lock:
+        build_lock = view_model_builds.setdefault(key, threading.Lock())
+    try:
+        with build_lock:
+            # Built by the thread this one waited for, e.g. the warm-up
+            view_model = view_model_cache.get(key)
+            if view_model is None:
+                data, duration_view_counts = view_inputs(snapshot, selected_category, sort_by)
+                # Includes the top_n and wordcloud stages timed inside the builders
+                with metrics.stage('figure_build'):
+                    if sort_by == 'Trends':
+                        view_model = build_trends_view(data, duration_view_counts, get_term_stats(snapshot, selected_category), progress)
+                    else:
+                        view_model = build_engagement_view(data)
+                view_model_cache[key] = view_model
+    finally:
+        with view_model_builds_lock:
+            view_model_builds.pop(key, None)
+    return view_model
+
+def warm_view_model_cache(categories=None, snapshot=None):
+    # Building the Trends views also pre-warms the word cloud cache for every category.
+    snapshot = snapshot or registry.snapshot()
+    categories = categories or list(snapshot.categories) + [all_categories]
+    # Drop entries left over from an older version of these categories before rebuilding
+    for key in [key for key in list(view_model_cache) if key[0] in categories and key[2] != category_version(snapshot, key[0])]:
+        view_model_cache.pop(key, None)
+    for category in categories:
+        for sort_by in analysis_types:
+            try:
+                get_view_model(category, sort_by, snapshot)
+            except Exception as e:
+                # Leave this view to the first request rather than stopping the warm-up
+                print(f"Warming {category} {sort_by} failed: {e!r}")
+    print(f"View model cache warmed for {len(categories)} views (data version {snapshot.version}), word clouds: {wordcloud_cache.stats()}")
+
+# Warm on a background thread so importing the app (and booting a gunicorn worker) does not wait
+# for figures and word clouds; requests arriving first build the views they need themselves.
+# Reloaded categories are rewarmed on the reloader thread, once per swap, so "all" is rebuilt
+# once however many categories a reload replaced. Background jobs import the app too, but only
+# render the one view they were started for.
+if not in_job_process():
+    threading.Thread(target=warm_view_model_cache, name='warm-view-models', daemon=True).start()
+    registry.on_swap(lambda categories, snapshot: warm_view_model_cache(categories + [all_categories], snapshot))
+
+@server.route('/data-version')
+def data_version():
+    return jsonify(registry.describe())
+
+@server.route('/api/rollups/<name>')
+def rollup_api(name):
+    '''
+    Cross-category rollups: channels, durations and hashtags per category (?category=news) or
+    summed over all of them (default), and categories for the per-category totals. ?limit=n
+    (n >= 1) returns the first n rows; channels are ordered by total interactions, hashtags by videos.
+    '''
+    rollups = get_rollups(registry.snapshot())
+    category = request.args.get('category', all_categories)
+    rows = rollups.records.get((name, category))
+    if rows is None:
+        abort(404)
+    limit = request.args.get('limit', type=int)
+    if 'limit' in request.args and (limit is None or limit < 1):
+        abort(400, 'limit must be a positive integer')
+    return jsonify({'version': rollups.version, 'rollup': name, 'category': category, 'rows': rows if limit is None else rows[:limit]})
+
+@server.route('/memory')
+def memory():
+    # Per-category memory of this worker, for sizing gunicorn workers
+    return jsonify(memory_report(registry.categories))
+
+# Poll the data directory for new scrapes or a rebuilt store; 0 disables hot reloading
+reload_interval = float(os.environ.get('DATA_RELOAD_INTERVAL', '10'))
+if reload_interval > 0 and not in_job_process():
+    DataReloader(registry, data_directory, reload_interval).start()
+
+search_page_size = 10
+max_search_results = 100
+
+def search_posts(data, search_index, search_value, search_mode):
+    '''
+    Finds posts matching the search string.
+
+    Parameters:
+    search_mode (str): 'keywords' uses the inverted index (AND terms, "quoted phrases"),
+    'substring' scans title and description for the literal string.
+
+    Returns:
+    results: Matching rows ordered by total interactions.
+    '''
+    if search_mode == 'keywords':
+        rows = search_index.search(search_value)
+        if rows is not None:
+            return data.iloc[rows[:max_search_results]]
+        # Nothing indexable in the query (stop words or punctuation only), fall back to substring matching
+    matches = data['title'].str.contains(search_value, case=False, na=False, regex=False).to_numpy(dtype=bool) | search_index.descriptions.contains(search_value)
+    return data[matches].sort_values(by='Total Interactions', ascending=False).head(max_search_results)
+
+def search_all_categories(snapshot, search_value, search_mode):
+    # Every category has its own index; merge their best results
+    results = [search_posts(data, search_index, search_value, search_mode) for data, duration_view_counts, search_index in snapshot.categories.values()]
+    results = pd.concat([result[['title', 'channel', 'id', 'Total Interactions']].astype({'channel': str}) for result in results], ignore_index=True)
+    return results.sort_values(by='Total Interactions', ascending=False, kind='stable').head(max_search_results)
+
+@app.callback(
+    Output('search-page', 'data'),
+    [Input('search-button', 'n_clicks'),
+     Input('search-prev', 'n_clicks'),
+     Input('search-next', 'n_clicks')],
+    [State('search-page', 'data'),
+     State('search-page-count', 'data')]
+)
+@metrics.instrument('update_search_page', ['search-page.data'])
+def update_search_page(n_clicks, prev_clicks, next_clicks, page, page_count):
+    triggered = dash.callback_context.triggered_id
+    if triggered == 'search-prev':
+        return max(page - 1, 0)
+    if triggered == 'search-next':
+        return min(page + 1, max(page_count - 1, 0))
+    return 0
+
+# Each analysis type and the search results have their own callback, so a search click only
+# sends search results and switching the analysis type never reruns the search. The *-rendered
+# stores hold the key of what the browser already shows; a callback whose key did not change
+# returns no_update instead of resending the same figures.
+def rendered_key(*parts):
+    return json.dumps(parts)
+
+def render_search_page(search_results, search_page):
+    page_results = search_results.iloc[search_page * search_page_size:(search_page + 1) * search_page_size]
+    summary = f"Showing {search_page * search_page_size + 1}-{search_page * search_page_size + len(page_results)} of {len(search_results)}"
+    items = [html.Li([
+        html.P(f"Title: {title}"),
+        html.P(f"Channel: {channel}"),
+        html.A("Watch Video", href=video_url, target="_blank")
+    ]) for title, channel, video_url in zip(page_results['title'], page_results['channel'], video_urls(page_results['id']))]
+    return summary, items
+
+search_outputs = [Output('search-results', 'children'),
+                  Output('search-page-count', 'data'),
+                  Output('search-rendered', 'data')]
+
+@app.callback(
+    search_outputs,
+    [Input('search-page', 'data'),
+     Input('category-dropdown', 'value')],
+    [State('search-input', 'value'),
+     State('search-mode', 'value'),
+     State('search-rendered', 'data')]
+)
+@metrics.instrument('update_search_results', [str(output) for output in search_outputs])
+def update_search_results(search_page, selected_category, search_value, search_mode, rendered):
+    if not search_value:
+        if rendered is None:
+            return dash.no_update, dash.no_update, dash.no_update
+        return html.Div(), 0, None
+
+    with metrics.stage('data_lookup'):
+        snapshot = registry.snapshot()
+    key = rendered_key(selected_category, category_version(snapshot, selected_category), search_value, search_mode)
+    with metrics.stage('search'):
+        if selected_category == all_categories:
+            search_results = search_all_categories(snapshot, search_value, search_mode)
         else:
-            search_results_content = html.Div([
-                html.H4("Search Results", style={'fontFamily': 'Anton', 'textAlign': 'center'}),
-                html.P("No Video Found", style={'textAlign': 'center'})
-            ], style={'marginTop': '20px'})
-    else:
-        search_results_content = html.Div()
+            data, duration_view_counts, search_index = snapshot.categories[selected_category]
+            search_results = search_posts(data, search_index, search_value, search_mode)
+
+    if search_results.empty:
+        return html.Div([
+            html.H4("Search Results", style={'fontFamily': 'Anton', 'textAlign': 'center'}),
+            html.P("No Video Found", style={'textAlign': 'center'})
+        ], style={'marginTop': '20px'}), 0, key
+
+    search_page_count = (len(search_results) + search_page_size - 1) // search_page_size
+    search_page = min(search_page or 0, search_page_count - 1)
+    summary, items = render_search_page(search_results, search_page)
+    if key == rendered:
+        # Same results, another page: only replace the summary line and the list
+        patch = dash.Patch()
+        patch['props']['children'][1]['props']['children'] = summary
+        patch['props']['children'][2]['props']['children'] = items
+        return patch, dash.no_update, dash.no_update
+    return html.Div([
+        html.H4("Relevant Posts:", style={'fontFamily': 'Roboto', 'textAlign': 'center'}),
+        html.P(summary, style={'textAlign': 'center'}),
+        html.Ul(items)
+    ], style={'marginTop': '20px'}), search_page_count, key
+
+engagement_outputs = [Output('bar-chart', 'figure'),
+                      Output('subscriber-chart', 'figure'),
+                      Output('dot-like-chart', 'figure'),
+                      Output('dot-dislike-chart', 'figure'),
+                      Output('line-graph', 'figure'),
+                      Output('line-graph-params', 'children'),
+                      Output('line-graph-message', 'children'),
+                      Output('engagement-rendered', 'data')]
+
+@app.callback(
+    engagement_outputs,
+    [Input('category-dropdown', 'value'),
+     Input('sort-dropdown', 'value')],
+    [State('engagement-rendered', 'data')]
+)
+@metrics.instrument('update_engagement_view', [str(output) for output in engagement_outputs])
+def update_engagement_view(selected_category, sort_by, rendered):
+    if sort_by != 'Engagement Metrics':
+        return [dash.no_update] * len(engagement_outputs)
+    metrics.hit(selected_category)
+    with metrics.stage('data_lookup'):
+        snapshot = registry.snapshot()
+    key = rendered_key(selected_category, category_version(snapshot, selected_category))
+    if key == rendered:
+        return [dash.no_update] * len(engagement_outputs)
+    with metrics.stage('view_model'):
+        view_model = get_view_model(selected_category, sort_by, snapshot)
+    return (view_model['bar_fig'], view_model['subscriber_fig'], view_model['dot_like_fig'], view_model['dot_dislike_fig'],
+            view_model['line_fig'], json.dumps({'category': selected_category, 'sort_by': sort_by}), view_model['line_message'], key)
+
+trends_outputs = [Output('wordcloud-container', 'children'),
+                  Output('additional-graphs', 'children'),
+                  Output('trends-rendered', 'data')]
 
-    return fig, subscriber_fig, dot_like_fig, dot_dislike_fig, wordcloud_container, bar_chart_style, subscriber_chart_style, dot_like_chart_style, dot_dislike_chart_style, wordcloud_container_style, additional_graphs_content, line_fig, line_graph_style, search_results_content
+def pending_trends_key(selected_category, sort_by, rendered):
+    # Key of the Trends view the browser needs, None if Trends is not selected or already shown
+    if sort_by != 'Trends':
+        return None, None
+    metrics.hit(selected_category)
+    with metrics.stage('data_lookup'):
+        snapshot = registry.snapshot()
+    key = rendered_key(selected_category, category_version(snapshot, selected_category))
+    return (None if key == rendered else key), snapshot
+
+# TRENDS_BACKGROUND=1 renders Trends views as Dash background callbacks in local subprocesses,
+# with results and locks in a diskcache directory, so a burst of Trends requests cannot tie up
+# the gunicorn workers. Identical renders in flight are done once and at most TRENDS_MAX_RENDERS
+# run at a time.
+trends_background = os.environ.get('TRENDS_BACKGROUND', '0') == '1'
+
+if trends_background:
+    trends_job_manager, trends_job_cache = create_manager(os.environ.get('TRENDS_JOB_CACHE_DIR', os.path.join(script_dir, 'cache', 'jobs')))
+    trends_max_renders = int(os.environ.get('TRENDS_MAX_RENDERS', '2'))
+    # Seconds after which a job gives up on a render and frees its lock and slot
+    trends_job_timeout = float(os.environ.get('TRENDS_JOB_TIMEOUT', '120'))
+
+    @app.callback(
+        Output('trends-request', 'data'),
+        [Input('category-dropdown', 'value'),
+         Input('sort-dropdown', 'value')],
+        [State('trends-rendered', 'data')]
+    )
+    @metrics.instrument('update_trends_view', ['trends-request.data'])
+    def request_trends_view(selected_category, sort_by, rendered):
+        key, snapshot = pending_trends_key(selected_category, sort_by, rendered)
+        return key if key is not None else dash.no_update
+
+    @app.callback(
+        trends_outputs,
+        Input('trends-request', 'data'),
+        background=True,
+        manager=trends_job_manager,
+        progress=[Output('trends-progress', 'value'), Output('trends-progress', 'max')],
+        running=[(Output('trends-status', 'style'), {'display': 'block', 'textAlign': 'center'}, {'display': 'none'})],
+        prevent_initial_call=True
+    )
+    def render_trends_view(set_progress, key):
+        # The job loaded the data itself, so its data versions are not the worker's: the key the
+        # worker asked for is answered with what is on disk now
+        selected_category = json.loads(key)[0]
+        snapshot = registry.snapshot()
+
+        # Data versions restart with every process, so shared results are keyed on the data itself
+        data, duration_view_counts = view_inputs(snapshot, selected_category, 'Trends')
+        fingerprint = f"{pd.util.hash_pandas_object(data[['title', 'hashtags', 'view_count']], index=False).sum():x}-{pd.util.hash_pandas_object(duration_view_counts['view_count'], index=False).sum():x}"
+
+        def render():
+            view_model = get_view_model(selected_category, 'Trends', snapshot, lambda step: set_progress((str(step), str(trends_render_steps))))
+            return view_model['wordcloud_container'], view_model['additional_graphs_content']
+
+        wordcloud_container, additional_graphs_content = render_once(trends_job_cache, 'trends', f'{selected_category}:{fingerprint}', render, trends_max_renders,
+                                                                     trends_job_timeout, on_wait=lambda: set_progress(('0', str(trends_render_steps))))
+        return wordcloud_container, additional_graphs_content, key
+else:
+    @app.callback(
+        trends_outputs,
+        [Input('category-dropdown', 'value'),
+         Input('sort-dropdown', 'value')],
+        [State('trends-rendered', 'data')]
+    )
+    @metrics.instrument('update_trends_view', [str(output) for output in trends_outputs])
+    def update_trends_view(selected_category, sort_by, rendered):
+        key, snapshot = pending_trends_key(selected_category, sort_by, rendered)
+        if key is None:
+            return [dash.no_update] * len(trends_outputs)
+        with metrics.stage('view_model'):
+            view_model = get_view_model(selected_category, sort_by, snapshot)
+        return view_model['wordcloud_container'], view_model['additional_graphs_content'], key
+
+# Showing and hiding the graphs of the selected analysis type happens in the browser
+chart_style = {'width': '75%', 'display': 'inline-block', 'vertical-align': 'top', 'margin-bottom': '20px', 'boxSizing': 'border-box', 'padding': '10px'}
+register_style_toggle(app, 'sort-dropdown', {
+    'bar-chart': {'Engagement Metrics': chart_style},
+    'subscriber-chart': {'Engagement Metrics': chart_style},
+    'dot-like-chart': {'Engagement Metrics': chart_style},
+    'dot-dislike-chart': {'Engagement Metrics': chart_style},
+    'line-graph': {'Engagement Metrics': {'display': 'block', 'margin-top': '20px', 'width': '95%', 'height': '500px'}},
+    'line-graph-message': {'Engagement Metrics': {'textAlign': 'center'}},
+    'wordcloud-container': {'Trends': {'display': 'flex', 'justify-content': 'center', 'align-items': 'center', 'margin': '20px auto', 'width': '0%', 'height': '400px'}},
+    'additional-graphs': {'Trends': {'marginTop': '20px', 'width': '100%'}}
+})
+
+app.clientside_callback(
+    """
+    function(page_count) {
+        return page_count > 1 ? {'display': 'flex', 'justifyContent': 'center', 'gap': '10px'} : {'display': 'none'};
+    }
+    """,
+    Output('search-pagination', 'style'),
+    Input('search-page-count', 'data')
+)
+
+def build_line_graph_window(params, start, end):
+    view_model = get_view_model(params['category'], params['sort_by'])
+    if view_model['liked_users'] is None:
+        return dash.no_update, dash.no_update
+    with metrics.stage('figure_build'):
+        return build_line_window(view_model['liked_users'], start, end)
+
+register_windowed_graph_callback(app, 'line-graph', 'line-graph-params', 'line-graph-message', build_line_graph_window, line_window_size,
+                                 instrument=metrics.instrument('update_line_window', ['line-graph.figure', 'line-graph-message.children']))
 
 if __name__ == '__main__':
     app.run_server(debug=True, host='0.0.0.0', port=80)
-
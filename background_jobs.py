@@ -0,0 +1,100 @@
+import os
+import threading
+from dash import DiskcacheManager
+
+try:
+    import diskcache
+    import multiprocess
+except ImportError:
+    diskcache = None  # Background rendering needs dash[diskcache]: diskcache, multiprocess and psutil
+
+class SpawnDiskcacheManager(DiskcacheManager):
+    '''
+    DiskcacheManager whose jobs start in a new interpreter instead of a fork of the worker.
+
+    A fork copies the worker's locks as they were at that moment, and the warm-up, reloader and
+    profiler threads may be holding one; the single-threaded fork then waits on it forever. A
+    spawned job imports the app afresh and loads the data from the store itself.
+    '''
+    def call_job_fn(self, key, job_fn, args, context):
+        process = multiprocess.get_context('spawn').Process(target=job_fn, args=(key, self._make_progress_key(key), args, context))
+        process.start()
+        return process.pid
+
+def in_job_process():
+    # True in a background job; gunicorn workers are forked by gunicorn, not by multiprocess
+    return diskcache is not None and multiprocess.parent_process() is not None
+
+def create_manager(directory):
+    '''
+    Creates the Dash background callback manager. Jobs run in local subprocesses and their
+    results, progress and locks live in a diskcache directory shared by all gunicorn workers,
+    so no broker is needed.
+
+    Returns:
+    manager, cache
+    '''
+    if diskcache is None:
+        raise ImportError('Background rendering requires diskcache, multiprocess and psutil (pip install "dash[diskcache]")')
+    cache = diskcache.Cache(directory)
+    return SpawnDiskcacheManager(cache), cache
+
+def render_once(cache, name, key, render, max_concurrent=2, timeout=120, expire=600, on_wait=None):
+    '''
+    Returns render() for key, rendering it at most once across all workers and jobs.
+
+    Jobs asking for a key that is already being rendered wait for that render and reuse its
+    result instead of starting their own. At most `max_concurrent` renders of `name` run at a
+    time; the others wait for a slot.
+
+    A job still holding the lock after `timeout` seconds, waiting for a slot or rendering, gives
+    up: it releases its lock and slot and its process exits, so a hung render cannot block
+    identical requests or other renders. The locks also expire after `timeout` in case a job is
+    killed while holding one. Only call this in a job process.
+
+    Parameters:
+    render (callable): Builds the result in this process. Only the result crosses to other
+    processes, through the cache, so the result must be picklable; render itself need not be.
+    expire (float): Seconds results are kept for other jobs.
+    on_wait (callable): Called before blocking on a lock or slot, e.g. to report progress.
+    '''
+    result_key = f'{name}:result:{key}'
+    result = cache.get(result_key)
+    if result is not None:
+        return result
+    if on_wait:
+        on_wait()
+    lock = diskcache.Lock(cache, f'{name}:lock:{key}', expire=timeout)
+    slots = diskcache.BoundedSemaphore(cache, f'{name}:slots', value=max_concurrent, expire=timeout)
+    lock.acquire()
+    held = [lock.release]
+
+    def give_up():
+        print(f"Render of {name} {key} still running after {timeout} s, giving up")
+        for release in reversed(held):
+            try:
+                release()
+            except Exception:
+                pass
+        os._exit(1)
+
+    watchdog = threading.Timer(timeout, give_up)
+    watchdog.daemon = True
+    watchdog.start()
+    try:
+        # Another job may have rendered it while this one waited for the lock
+        result = cache.get(result_key)
+        if result is not None:
+            return result
+        slots.acquire()
+        held.append(slots.release)
+        try:
+            result = render()
+        finally:
+            held.pop()
+            slots.release()
+        cache.set(result_key, result, expire=expire)
+    finally:
+        watchdog.cancel()
+        lock.release()
+    return result
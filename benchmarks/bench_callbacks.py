@@ -0,0 +1,156 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATA_RELOAD_INTERVAL', '0')
+
+# Interactions replayed against the dashboard, in order: (name, {component.property: new value})
+scenario = [
+    ('page load', None),
+    ('search click', {'search-input.value': 'trump', 'search-button.n_clicks': 1}),
+    ('next page', {'search-next.n_clicks': 1}),
+    ('switch to Trends', {'sort-dropdown.value': 'Trends'}),
+    ('switch to Engagement', {'sort-dropdown.value': 'Engagement Metrics'}),
+    ('change category', {'category-dropdown.value': 'news'}),
+    ('search click (new query)', {'search-input.value': 'biden', 'search-button.n_clicks': 2}),
+]
+
+def component_values(node, values):
+    # Initial props of every component with an id in the /_dash-layout tree
+    if isinstance(node, list):
+        for child in node:
+            component_values(child, values)
+    elif isinstance(node, dict) and 'props' in node:
+        props = node['props']
+        if 'id' in props:
+            for prop, value in props.items():
+                values[f"{props['id']}.{prop}"] = value
+        component_values(props.get('children'), values)
+
+def split_outputs(output):
+    # "..a.figure...b.style.." or "a.figure", properties may carry an @hash for allow_duplicate
+    parts = output.strip('.').split('...') if output.startswith('..') else [output]
+    return [dict(zip(['id', 'property'], part.rsplit('.', 1))) for part in parts]
+
+class DashClient():
+    '''
+    Replays interactions like the Dash renderer does: fires every server callback whose input
+    changed, feeds its outputs to the callbacks that depend on them, and records the bytes and
+    time of every request. Background callbacks are polled until their job finishes.
+
+    Requests go through the Flask test client of `app`, or through `client` (any object with
+    Flask test client style get/post, e.g. load_test.HttpClient for a running server).
+    `latencies` collects the seconds of every request.
+    '''
+    def __init__(self, app=None, poll_interval=0.05, client=None):
+        self.poll_interval = poll_interval
+        self.client = client or app.server.test_client()
+        self.latencies = []
+        self.client.get('/')
+        self.dependencies = [dep for dep in self.client.get('/_dash-dependencies').get_json() if not dep.get('clientside_function')]
+        self.values = {}
+        component_values(self.client.get('/_dash-layout').get_json(), self.values)
+
+    def outputs_of(self, dep):
+        return {f"{o['id']}.{o['property'].split('@')[0]}" for o in split_outputs(dep['output'])}
+
+    def request(self, dep, changed):
+        body = {
+            'output': dep['output'],
+            'outputs': split_outputs(dep['output']) if dep['output'].startswith('..') else split_outputs(dep['output'])[0],
+            'inputs': [dict(item, value=self.values.get(f"{item['id']}.{item['property']}")) for item in dep['inputs']],
+            'state': [dict(item, value=self.values.get(f"{item['id']}.{item['property']}")) for item in dep['state']],
+            'changedPropIds': sorted(changed)
+        }
+        start = time.perf_counter()
+        response = self.client.post('/_dash-update-component', json=body)
+        size = len(response.data)
+        job = response.get_json() if response.status_code == 200 and 'cacheKey' in response.get_json() else None
+        while job:
+            # Background callback: poll the job like the renderer until it returns the outputs
+            time.sleep(self.poll_interval)
+            response = self.client.post(f"/_dash-update-component?cacheKey={job['cacheKey']}&job={job['job']}", json=body)
+            size += len(response.data)
+            if response.status_code != 200 or 'response' in response.get_json():
+                job = None
+        elapsed = time.perf_counter() - start
+        self.latencies.append(elapsed)
+        updated = set()
+        if response.status_code == 200:
+            for component_id, props in response.get_json()['response'].items():
+                for prop, value in props.items():
+                    self.values[f"{component_id}.{prop}"] = value
+                    updated.add(f"{component_id}.{prop}")
+        elif response.status_code != 204:
+            raise RuntimeError(f"{dep['output']} failed with {response.status_code}: {response.data[:500]}")
+        return size, elapsed, updated
+
+    def interact(self, changes):
+        if changes is None:
+            # Initial load fires every callback that does not opt out of the initial call
+            pending = {dep['output'] for dep in self.dependencies if not dep.get('prevent_initial_call')}
+            changed = set(self.values)
+        else:
+            self.values.update(changes)
+            changed = set(changes)
+            pending = {dep['output'] for dep in self.dependencies
+                       if any(f"{item['id']}.{item['property']}" in changed for item in dep['inputs'])}
+        requests, size, elapsed = 0, 0, 0.0
+        while pending:
+            firing = [dep for dep in self.dependencies if dep['output'] in pending]
+            produced = set().union(*(self.outputs_of(dep) for dep in firing))
+            # Like the renderer, wait for callbacks whose inputs are still being computed upstream
+            ready = [dep for dep in firing if not any(f"{item['id']}.{item['property']}" in produced - self.outputs_of(dep) for item in dep['inputs'])] or firing
+            pending -= {dep['output'] for dep in ready}
+            for dep in ready:
+                response_size, response_time, updated = self.request(dep, changed)
+                requests += 1
+                size += response_size
+                elapsed += response_time
+                changed = updated
+                pending |= {other['output'] for other in self.dependencies
+                            if any(f"{item['id']}.{item['property']}" in updated for item in other['inputs'])}
+        return {'requests': requests, 'bytes': size, 'ms': elapsed * 1000}
+
+def run(repeat):
+    import app
+    results = {}
+    for attempt in range(repeat):
+        client = DashClient(app.app)
+        for name, changes in scenario:
+            result = client.interact(changes)
+            # Keep the fastest run; sizes do not change between runs
+            if name not in results or result['ms'] < results[name]['ms']:
+                results[name] = result
+    return results
+
+def print_results(results, baseline=None):
+    print(f"\n{'interaction':<28}{'requests':>10}{'bytes':>10}{'ms':>10}{'bytes vs base':>16}{'ms vs base':>12}")
+    for name, result in results.items():
+        size_change = time_change = ''
+        if baseline and name in baseline:
+            size_change = f"{(result['bytes'] / max(baseline[name]['bytes'], 1) - 1) * 100:+.0f}%"
+            time_change = f"{(result['ms'] / max(baseline[name]['ms'], 1e-9) - 1) * 100:+.0f}%"
+        print(f"{name:<28}{result['requests']:>10}{result['bytes']:>10,}{result['ms']:>10.1f}{size_change:>16}{time_change:>12}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Response bytes and server time of each dashboard interaction, replayed through the Flask test client.')
+    parser.add_argument('--repeat', type=int, default=5, help='Replay the scenario this many times and keep the fastest run')
+    parser.add_argument('--save', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='Print the change against a JSON file written by --save')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = run(args.repeat)
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from page_cache import PageCache
+from scraper_concurrent import DetailFetcher
+from stub_server import start_stub_server
+
+def run(name, server, video_base, video_ids, page_cache, workers):
+    requests_before, not_modified_before = server.requests, server.not_modified
+    fetcher = DetailFetcher(video_base=video_base, max_workers=workers, concurrency=workers, rate=None, page_cache=page_cache)
+    start = time.perf_counter()
+    details = fetcher.get_many(video_ids)
+    seconds = time.perf_counter() - start
+    fetcher.close()
+    print(f"{name:<12}{seconds:>8.2f} s{server.requests - requests_before:>10}{server.not_modified - not_modified_before:>8}   {page_cache.stats()}")
+    return details
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Video detail fetching through the page cache against the local stub server: cold, warm, revalidated and offline runs.')
+    parser.add_argument('--videos', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.2, help='Simulated server latency in seconds')
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    server = start_stub_server(args.latency)
+    video_base = f'{server.base_url}/video/'
+    video_ids = [f'stub{i:08d}' for i in range(args.videos)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{args.videos} videos, {args.latency * 1000:.0f} ms simulated latency")
+        print(f"{'run':<12}{'time':>10}{'requests':>10}{'304s':>8}   counters")
+        cold = run('cold', server, video_base, video_ids, PageCache(directory), args.workers)
+        warm = run('warm', server, video_base, video_ids, PageCache(directory), args.workers)
+        # A TTL of 0 makes every page stale, so each one is revalidated with its ETag
+        revalidated = run('revalidate', server, video_base, video_ids, PageCache(directory, ttls={'video': 0}), args.workers)
+        offline = run('offline', server, video_base, video_ids, PageCache(directory, ttls={'video': 0}, offline=True), args.workers)
+        print(f"identical results: {cold == warm == revalidated == offline}")
+    server.shutdown()
@@ -0,0 +1,40 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraper_parsing import backends, parse_search_results, parse_video_details, parse_video_ids
+from stub_server import fixtures_directory
+from capture_pages import captured_directory
+
+def fixture_paths():
+    # Captured pages (see capture_pages.py) and the hand-written stub server pages
+    return sorted(glob.glob(os.path.join(captured_directory, '*.html'))) + sorted(glob.glob(os.path.join(fixtures_directory, '*.html')))
+
+def parse(name, src, backend):
+    if name.startswith('video'):
+        return parse_video_details(src, backend)
+    return parse_search_results(src, '0', backend), parse_video_ids(src, backend)
+
+def time_parsing(repeat):
+    print(f"{'page':<28}" + ''.join(f"{backend + ' ms/page':>16}" for backend in backends))
+    for path in fixture_paths():
+        name = os.path.basename(path)
+        with open(path, encoding='utf-8') as f:
+            src = f.read()
+        row = f"{name:<28}"
+        for backend in backends:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                parse(name, src, backend)
+            row += f"{(time.perf_counter() - start) / repeat * 1000:>16.3f}"
+        print(row)
+
+if __name__ == '__main__':
+    # Parity between the backends is checked by tests/test_parser_parity.py
+    parser = argparse.ArgumentParser(description='Per-page parse time of the scraper parsing backends.')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    time_parsing(args.repeat)
@@ -0,0 +1,73 @@
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import hours_ago_posted, run_pipeline, scraped_categories, scraped_file
+from data_store import category_files
+from synthetic_data import make_synthetic_category
+
+relative_times = ['{} hours ago', '{} minutes ago', '{} days ago', '{} weeks ago', '1 day, {} hours ago', 'Â{} hours ago', 'just now']
+
+def make_scraped_category(rows, seed=0):
+    # A recent_videos_bitchute_{name}.csv as written by the scraper: no derived columns yet, some duplicate ids
+    rng = np.random.default_rng(seed)
+    df = make_synthetic_category(rows, seed).drop(columns=['hours ago posted', 'total_interactions', 'video_url'])
+    templates = np.array(relative_times)[rng.integers(0, len(relative_times), rows)]
+    df['created_at'] = [template.format(number) for template, number in zip(templates, rng.integers(1, 60, rows))]
+    df.loc[rng.random(rows) < 0.01, 'created_at'] = np.nan
+    df.loc[rng.random(rows) < 0.05, 'id'] = df['id'].iloc[0]
+    df.insert(0, 'rank', np.arange(rows))
+    df['scrape_time'] = '2024-06-01 12:00:00'
+    return df
+
+def notebook_hours(relative_time_str):
+    # convert_relative_time_to_hours as it was in the notebook, the reference for hours_ago_posted
+    if pd.isna(relative_time_str):
+        return None
+    try:
+        relative_time_str = relative_time_str.replace(',', '').replace('Â', '').strip()
+        pattern = re.compile(r'(\d+)\s*(hour|minute|day|week)s?', re.IGNORECASE)
+        total_hours = 0
+        for number, unit in pattern.findall(relative_time_str):
+            number = int(number)
+            if 'hour' in unit:
+                total_hours += number
+            elif 'minute' in unit:
+                total_hours += number / 60
+            elif 'day' in unit:
+                total_hours += number * 24
+            elif 'week' in unit:
+                total_hours += number * 24 * 7
+        return total_hours
+    except Exception:
+        return None
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Relative-time parsing and the full clean-and-export pipeline on synthetic scraped data.')
+    parser.add_argument('--rows', type=int, default=100000, help='Rows per category')
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args()
+
+    sample = make_scraped_category(args.rows)
+    start = time.perf_counter()
+    reference = sample['created_at'].apply(notebook_hours)
+    apply_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    vectorized = hours_ago_posted(sample['created_at'])
+    vectorized_seconds = time.perf_counter() - start
+    print(f"relative times, {args.rows:,} rows: .apply {apply_seconds * 1000:.1f} ms, vectorized {vectorized_seconds * 1000:.1f} ms "
+          f"({apply_seconds / vectorized_seconds:.1f}x), identical: {reference.equals(vectorized)}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for offset, name in enumerate(scraped_categories):
+            make_scraped_category(args.rows, offset).to_csv(os.path.join(directory, scraped_file(name)), index=False)
+        print()
+        run_pipeline(directory, processes=args.processes)
+        written = pd.read_csv(os.path.join(directory, category_files['news']))
+        print(f"news: {len(written):,} rows, columns: {', '.join(written.columns)}")
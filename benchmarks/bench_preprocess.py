@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from preprocessing import coerce_counts, parse_durations, aggregate_titles, top_video_per_channel, bucket_durations
+from search_index import SearchIndex
+from synthetic_data import make_synthetic_category
+
+def measure(stage, func, results):
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    results[stage] = {'seconds': elapsed, 'peak_mb': peak / 2 ** 20}
+    return value
+
+def run(rows, directory, with_index):
+    path = os.path.join(directory, f'dash_csv_synthetic_{rows}.csv')
+    if not os.path.exists(path):
+        make_synthetic_category(rows).to_csv(path, index=False)
+
+    results = {}
+    df = measure('read_csv', lambda: pd.read_csv(path), results)
+    df = measure('coerce_counts', lambda: coerce_counts(df), results)
+    df['duration'] = measure('parse_durations', lambda: parse_durations(df['duration']), results)
+    agg_df = measure('aggregate_titles', lambda: aggregate_titles(df), results)
+    agg_df = measure('top_video_per_channel', lambda: top_video_per_channel(agg_df), results)
+    agg_df, duration_view_counts = measure('bucket_durations', lambda: bucket_durations(agg_df), results)
+    if with_index:
+        measure('search_index', lambda: SearchIndex(agg_df), results)
+    return results
+
+def print_results(rows, results, baseline=None):
+    print(f"\n{rows:,} rows")
+    print(f"{'stage':<24}{'seconds':>10}{'peak MB':>10}{'vs baseline':>14}")
+    for stage, result in results.items():
+        change = ''
+        if baseline and stage in baseline:
+            change = f"{(result['seconds'] / max(baseline[stage]['seconds'], 1e-9) - 1) * 100:+.0f}%"
+        print(f"{stage:<24}{result['seconds']:>10.3f}{result['peak_mb']:>10.1f}{change:>14}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Wall time and peak memory of each preprocess_data stage on synthetic category CSVs.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--data-dir', help='Where to keep the generated CSVs (default: a temporary directory)')
+    parser.add_argument('--no-index', action='store_true', help='Skip building the search index')
+    parser.add_argument('--save', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='Print the change in wall time against a JSON file written by --save')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    directory = args.data_dir or tempfile.mkdtemp(prefix='bitchute_bench_')
+    os.makedirs(directory, exist_ok=True)
+    all_results = {}
+    for rows in args.sizes:
+        all_results[str(rows)] = run(rows, directory, not args.no_index)
+        print_results(rows, all_results[str(rows)], baseline.get(str(rows)))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(all_results, f, indent=2)
@@ -0,0 +1,39 @@
+import argparse
+import os
+import sys
+import time
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraper_concurrent import DetailFetcher
+from scraper_parsing import parse_video_details
+from stub_server import start_stub_server
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serial vs concurrent video detail fetching against the local stub server.')
+    parser.add_argument('--videos', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.2, help='Simulated server latency in seconds')
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight per host')
+    parser.add_argument('--rate', type=float, default=None, help='Requests per second per host (default: unlimited)')
+    args = parser.parse_args()
+
+    server = start_stub_server(args.latency)
+    video_base = f'{server.base_url}/video/'
+    video_ids = [f'stub{i:08d}' for i in range(args.videos)]
+
+    start = time.perf_counter()
+    serial = {video_id: parse_video_details(requests.get(f'{video_base}{video_id}/', timeout=20).text) for video_id in video_ids}
+    serial_seconds = time.perf_counter() - start
+
+    fetcher = DetailFetcher(video_base=video_base, max_workers=args.workers, concurrency=args.concurrency, rate=args.rate)
+    start = time.perf_counter()
+    concurrent = fetcher.get_many(video_ids)
+    concurrent_seconds = time.perf_counter() - start
+    fetcher.close()
+    server.shutdown()
+
+    print(f"{args.videos} videos, {args.latency * 1000:.0f} ms simulated latency")
+    print(f"serial:     {serial_seconds:8.2f} s")
+    print(f"concurrent: {concurrent_seconds:8.2f} s ({serial_seconds / concurrent_seconds:.1f}x)")
+    print(f"identical results: {serial == concurrent}")
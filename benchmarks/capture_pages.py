@@ -0,0 +1,65 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import requests
+
+repo_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_directory)
+from page_cache import PageCache, page_type
+
+captured_directory = os.path.join(repo_directory, 'tests', 'fixtures', 'pages')
+
+# Page types read by scraper_parsing: video pages and the listings of video results
+parsed_types = ['video', 'category', 'search', 'hashtag']
+
+def fetch(page_cache, urls, timeout=20):
+    # Over plain HTTP through the cache, like DetailFetcher, so captured pages are also kept for reruns
+    session = requests.Session()
+    for url in urls:
+        page_cache.fetch(url, lambda url, headers: session.get(url, timeout=timeout, headers=headers))
+        print(f"Fetched {url}")
+
+def export(page_cache, per_type):
+    '''
+    Copies pages from the cache into captured_directory as {page type}_{content hash}.html,
+    the fixtures tests/test_parser_parity.py parses with every backend.
+
+    Parameters:
+    per_type (int): Maximum number of pages exported per page type.
+
+    Returns:
+    paths: Fixture files written or already present.
+    '''
+    os.makedirs(captured_directory, exist_ok=True)
+    counts, paths = {}, []
+    for index_path in sorted(glob.glob(os.path.join(page_cache.directory, 'index', '*.json'))):
+        with open(index_path) as f:
+            entry = json.load(f)
+        kind = page_type(entry['url'])
+        if kind not in parsed_types or counts.get(kind, 0) >= per_type:
+            continue
+        text = page_cache.read(entry)
+        if text is None:
+            continue
+        path = os.path.join(captured_directory, f"{kind}_{entry['digest'][:12]}.html")
+        if not os.path.exists(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        counts[kind] = counts.get(kind, 0) + 1
+        paths.append(path)
+    return paths
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Captures real video and listing pages from the page cache as parser parity fixtures.')
+    parser.add_argument('--cache', default=os.path.join(repo_directory, 'data', 'page_cache'),
+                        help='Page cache written by a scraper run (default: data/page_cache)')
+    parser.add_argument('--fetch', nargs='+', default=[], metavar='URL', help='Fetch these pages into the cache first')
+    parser.add_argument('--per-type', type=int, default=5, help='Pages exported per page type')
+    args = parser.parse_args()
+
+    page_cache = PageCache(args.cache)
+    fetch(page_cache, args.fetch)
+    paths = export(page_cache, args.per_type)
+    print(f"{len(paths)} fixtures in {captured_directory}")
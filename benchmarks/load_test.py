@@ -0,0 +1,287 @@
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import psutil
+import requests
+
+benchmarks_directory = os.path.dirname(os.path.abspath(__file__))
+repo_directory = os.path.dirname(benchmarks_directory)
+sys.path.insert(0, repo_directory)
+from data_store import build_store, category_files
+from synthetic_data import words, write_synthetic_data
+from bench_callbacks import DashClient
+
+categories = list(category_files) + ['all']
+
+# Relative frequency of each user action in a session
+actions = [('category', 3), ('trends', 3), ('search', 2), ('next page', 1)]
+
+class HttpResponse():
+    # The parts of a Flask test client response that DashClient uses
+    def __init__(self, response):
+        self.response = response
+        self.status_code = response.status_code
+        self.data = response.content
+
+    def get_json(self):
+        return self.response.json()
+
+class HttpClient():
+    '''
+    Flask test client style get/post against a running server, so DashClient can drive it.
+    '''
+    def __init__(self, base_url, timeout=120):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def get(self, path):
+        return HttpResponse(self.session.get(self.base_url + path, timeout=self.timeout))
+
+    def post(self, path, json=None):
+        return HttpResponse(self.session.post(self.base_url + path, json=json, timeout=self.timeout))
+
+def user_session(base_url, seed, steps):
+    '''
+    One simulated user: loads the page, then switches categories, toggles Trends, searches and
+    pages through results in a random order seeded by `seed`.
+
+    Returns:
+    latencies: Seconds of every /_dash-update-component request.
+    interactions: Seconds of every interaction, all the requests it set off together.
+    errors: Number of interactions that failed.
+    '''
+    rng = random.Random(seed)
+    dash_client = DashClient(client=HttpClient(base_url))
+    interactions, errors = [], 0
+    names, weights = zip(*actions)
+    search_clicks = next_clicks = 0
+    for step in range(steps + 1):
+        if step == 0:
+            changes = None
+        else:
+            action = rng.choices(names, weights)[0]
+            if action == 'category':
+                changes = {'category-dropdown.value': rng.choice(categories)}
+            elif action == 'trends':
+                current = dash_client.values.get('sort-dropdown.value')
+                changes = {'sort-dropdown.value': 'Engagement Metrics' if current == 'Trends' else 'Trends'}
+            elif action == 'search':
+                search_clicks += 1
+                changes = {'search-input.value': rng.choice(words), 'search-button.n_clicks': search_clicks}
+            else:
+                next_clicks += 1
+                changes = {'search-next.n_clicks': next_clicks}
+        start = time.perf_counter()
+        try:
+            dash_client.interact(changes)
+        except (RuntimeError, requests.RequestException) as e:
+            errors += 1
+            print(f"User {seed}: {e}")
+        interactions.append(time.perf_counter() - start)
+    return dash_client.latencies, interactions, errors
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+class Server():
+    '''
+    app:server under gunicorn on a free local port, with the Procfile.txt command unchanged
+    apart from --bind and, when given, --workers, --threads and --timeout.
+
+    Waits until every worker has loaded the data and warmed its view model cache. While
+    `sample()` runs in the background, the peak resident size of every worker is recorded.
+    '''
+    def __init__(self, data_directory, cache_directory, workers=None, threads=None, timeout=None, startup_timeout=600):
+        self.port = free_port()
+        self.base_url = f'http://127.0.0.1:{self.port}'
+        self.workers = workers or 1
+        self.log_path = os.path.join(cache_directory, 'gunicorn.log')
+        env = dict(os.environ,
+                   DATA_DIRECTORY=data_directory,
+                   DATA_RELOAD_INTERVAL='0',
+                   WORDCLOUD_CACHE_DIR=os.path.join(cache_directory, 'wordclouds'),
+                   TRENDS_JOB_CACHE_DIR=os.path.join(cache_directory, 'jobs'))
+        command = [sys.executable, '-m', 'gunicorn', 'app:server', '--chdir', repo_directory, '--bind', f'127.0.0.1:{self.port}']
+        # Only what was asked for, so worker timeouts hit the deployment also fail here
+        for option, value in (('--workers', workers), ('--threads', threads), ('--timeout', timeout)):
+            if value is not None:
+                command += [option, str(value)]
+        self.log = open(self.log_path, 'w')
+        self.process = subprocess.Popen(command, env=env, stdout=self.log, stderr=subprocess.STDOUT)
+        self.peak_rss = {}
+        self.sampling = False
+        self.wait_until_ready(startup_timeout)
+
+    def wait_until_ready(self, startup_timeout):
+        deadline = time.monotonic() + startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with {self.process.returncode}, see {self.log_path}")
+            with open(self.log_path) as f:
+                warmed = f.read().count('View model cache warmed')
+            if warmed >= self.workers:
+                return
+            time.sleep(0.5)
+        self.stop()
+        raise RuntimeError(f"gunicorn workers not ready after {startup_timeout} s, see {self.log_path}")
+
+    def worker_processes(self):
+        try:
+            return psutil.Process(self.process.pid).children(recursive=True)
+        except psutil.NoSuchProcess:
+            return []
+
+    def record_rss(self):
+        for worker in self.worker_processes():
+            try:
+                rss = worker.memory_info().rss
+            except psutil.NoSuchProcess:
+                continue
+            self.peak_rss[worker.pid] = max(self.peak_rss.get(worker.pid, 0), rss)
+
+    def sample(self, interval=0.2):
+        self.sampling = True
+        def run():
+            while self.sampling:
+                self.record_rss()
+                time.sleep(interval)
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.sampling = False
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.close()
+
+def run_level(server, users, steps, seed):
+    server.peak_rss = {}
+    sampler = server.sample()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        sessions = list(executor.map(lambda user: user_session(server.base_url, seed + user, steps), range(users)))
+    seconds = time.perf_counter() - start
+    server.sampling = False
+    sampler.join()
+    server.record_rss()
+    latencies = np.array([latency for session in sessions for latency in session[0]]) * 1000
+    interactions = np.array([interaction for session in sessions for interaction in session[1]]) * 1000
+    rss = [value / 2 ** 20 for value in server.peak_rss.values()] or [0]
+    return {
+        'users': users,
+        'requests': len(latencies),
+        'interactions': len(interactions),
+        'errors': sum(session[2] for session in sessions),
+        'seconds': seconds,
+        'requests_per_s': len(latencies) / seconds,
+        'interactions_per_s': len(interactions) / seconds,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'interaction_p95_ms': float(np.percentile(interactions, 95)),
+        'worker_rss_mb': [round(value, 1) for value in rss],
+        'max_worker_rss_mb': max(rss)
+    }
+
+def run(scales, base_rows, user_levels, steps, workers, threads, timeout, seed):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in scales:
+            data_directory = os.path.join(directory, f'data_{scale}x')
+            rows = base_rows * scale
+            print(f"Generating {rows:,} synthetic rows per category ({scale}x)")
+            write_synthetic_data(data_directory, rows, seed)
+            build_store(data_directory)
+            cache_directory = os.path.join(directory, f'cache_{scale}x')
+            os.makedirs(cache_directory, exist_ok=True)
+            start = time.perf_counter()
+            server = Server(data_directory, cache_directory, workers, threads, timeout)
+            print(f"gunicorn with {workers or 1} worker(s) x {threads or 1} thread(s) ready in {time.perf_counter() - start:.1f} s")
+            try:
+                for users in user_levels:
+                    result = run_level(server, users, steps, seed)
+                    results[f'{scale}x/{users}u'] = dict(result, scale=scale, rows=rows)
+                    print_results({f'{scale}x/{users}u': results[f'{scale}x/{users}u']})
+            finally:
+                server.stop()
+    return results
+
+# (result key, higher is worse) checked against the baseline in regression mode
+regression_checks = [('p95_ms', True), ('p99_ms', True), ('requests_per_s', False), ('max_worker_rss_mb', True)]
+
+def print_results(results, baseline=None):
+    print(f"\n{'run':<12}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'worker RSS MB':>16}")
+    for name, result in results.items():
+        print(f"{name:<12}{result['requests']:>10}{result['errors']:>8}{result['requests_per_s']:>9.1f}{result['p50_ms']:>9.1f}"
+              f"{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}{result['max_worker_rss_mb']:>16.1f}")
+        if baseline and name in baseline:
+            print(f"{'  vs base':<12}{'':>18}" + ''.join(f"{(result[key] / max(baseline[name][key], 1e-9) - 1) * 100:>+8.0f}%"
+                                                         for key in ['requests_per_s', 'p50_ms', 'p95_ms', 'p99_ms'])
+                  + f"{(result['max_worker_rss_mb'] / max(baseline[name]['max_worker_rss_mb'], 1e-9) - 1) * 100:>+15.0f}%")
+
+def regressions(results, baseline, tolerance):
+    '''
+    Returns a message for every result that is more than `tolerance` (a fraction) worse than the baseline.
+    '''
+    found = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for key, higher_is_worse in regression_checks:
+            change = result[key] / max(baseline[name][key], 1e-9) - 1
+            if (change if higher_is_worse else -change) > tolerance:
+                found.append(f"{name} {key}: {baseline[name][key]:.1f} -> {result[key]:.1f} ({change * 100:+.0f}%)")
+        if result['errors'] > baseline[name]['errors']:
+            found.append(f"{name} errors: {baseline[name]['errors']} -> {result['errors']}")
+    return found
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load test of app:server under gunicorn with synthetic data at several scales and numbers of concurrent users.')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100], help='Data sizes as multiples of --rows')
+    parser.add_argument('--rows', type=int, default=1000, help='Synthetic rows per category at scale 1')
+    parser.add_argument('--users', type=int, nargs='+', default=[1, 4, 16], help='Numbers of concurrent users to run at every scale')
+    parser.add_argument('--steps', type=int, default=20, help='Interactions per user after the page load')
+    parser.add_argument('--workers', type=int, help='gunicorn --workers (default: gunicorn\'s default of 1, as Procfile.txt runs it)')
+    parser.add_argument('--threads', type=int, help='gunicorn --threads per worker (default: gunicorn\'s default of 1)')
+    parser.add_argument('--timeout', type=int, help='gunicorn --timeout in seconds (default: gunicorn\'s default of 30)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help='Write the results to this JSON file, e.g. as a baseline')
+    parser.add_argument('--compare', help='Compare against a JSON file written by --save and exit with 1 on a regression')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown or growth against the baseline, as a fraction')
+    args = parser.parse_args()
+
+    results = run(args.scales, args.rows, args.users, args.steps, args.workers, args.threads, args.timeout, args.seed)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        found = regressions(results, baseline, args.tolerance)
+        for message in found:
+            print(f"Regression: {message}")
+        if found:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance * 100:.0f}% against {args.compare}")
@@ -0,0 +1,82 @@
+import argparse
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+fixtures_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+def load_fixture(name):
+    with open(os.path.join(fixtures_directory, name), encoding='utf-8') as f:
+        return f.read()
+
+class StubHandler(BaseHTTPRequestHandler):
+    '''
+    Serves the saved HTML fixtures with BitChute's URL layout:
+    /video/{id}/ -> fixtures/video.html, /search/... and /category/... -> fixtures/search.html.
+    '''
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        if server.latency:
+            time.sleep(server.latency)
+        parts = [part for part in self.path.split('?')[0].split('/') if part]
+        if len(parts) == 2 and parts[0] == 'video':
+            body = load_fixture('video.html').replace('{video_id}', parts[1])
+        elif parts and parts[0] in ('search', 'category') and os.path.exists(os.path.join(fixtures_directory, 'search.html')):
+            body = load_fixture('search.html')
+        else:
+            self.send_error(404)
+            return
+        data = body.encode('utf-8')
+        # Fixtures never change, so the ETag is a hash of the body and a matching If-None-Match gets a 304
+        etag = f'"{hashlib.sha256(data).hexdigest()[:16]}"'
+        if self.headers.get('If-None-Match') == etag:
+            with server.lock:
+                server.not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_server(latency=0.0, port=0):
+    '''
+    Starts the stub server on a background thread.
+
+    Returns:
+    server: The running server; server.base_url is its address, server.requests counts
+    requests served (server.not_modified of them answered with a 304), and server.shutdown() stops it.
+    '''
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.requests = 0
+    server.not_modified = 0
+    server.lock = threading.Lock()
+    server.base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve the BitChute HTML fixtures locally.')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait before every response')
+    args = parser.parse_args()
+    server = start_stub_server(args.latency, args.port)
+    print(f"Serving fixtures on {server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
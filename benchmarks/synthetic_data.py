@@ -0,0 +1,62 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_store import category_files
+
+words = ['news', 'election', 'market', 'crypto', 'health', 'vaccine', 'truth', 'live', 'update', 'breaking', 'report',
+         'world', 'economy', 'gold', 'war', 'freedom', 'media', 'police', 'storm', 'energy', 'food', 'farm', 'school', 'game']
+
+def make_synthetic_category(rows, seed=0):
+    '''
+    Generates a frame shaped like the dash_csv_{category}.csv files written by the scraper notebook.
+
+    Titles repeat about once in five rows and channels about once in twenty, so the title
+    aggregation and the one-video-per-channel step both have real work to do.
+    '''
+    rng = np.random.default_rng(seed)
+    title_ids = rng.integers(0, max(rows * 4 // 5, 1), rows)
+    channel_ids = rng.integers(0, max(rows // 20, 1), rows)
+    vocabulary = np.array(words)
+    title_words = vocabulary[rng.integers(0, len(vocabulary), (rows, 3))]
+    titles = pd.Series(title_words[:, 0]).str.cat([pd.Series(title_words[:, 1]), pd.Series(title_words[:, 2]), pd.Series(title_ids.astype(str))], sep=' ')
+    minutes = rng.integers(0, 45, rows)
+    seconds = rng.integers(0, 60, rows)
+    durations = pd.Series(minutes.astype(str)).str.cat(pd.Series(seconds).map('{:02d}'.format), sep=':')
+    # Long streams use h:mm:ss
+    long_videos = rng.random(rows) < 0.05
+    durations[long_videos] = '1:' + durations[long_videos]
+    ids = pd.Series(rng.integers(0, 36 ** 8, rows)).map(lambda x: np.base_repr(x, 36).lower().rjust(8, '0'))
+    view_count = rng.integers(0, 100000, rows).astype(float)
+    view_count[rng.random(rows) < 0.02] = np.nan
+    like_count = rng.integers(0, 500, rows)
+    dislike_count = rng.integers(0, 50, rows)
+    subscriber_count = (channel_ids % 1000) * 37
+    return pd.DataFrame({
+        'id': ids,
+        'title': titles,
+        'hashtags': '#' + pd.Series(vocabulary[rng.integers(0, len(vocabulary), rows)]) + ',#' + pd.Series(vocabulary[rng.integers(0, len(vocabulary), rows)]),
+        'view_count': view_count,
+        'duration': durations,
+        'channel': 'channel_' + pd.Series(channel_ids.astype(str)),
+        'channel_id': 'channel' + pd.Series(channel_ids.astype(str)),
+        'description': 'Full ' + titles + ' coverage, like and subscribe for more ' + pd.Series(vocabulary[rng.integers(0, len(vocabulary), rows)]),
+        'description_links': '[]',
+        'created_at': pd.Series(rng.integers(1, 72, rows).astype(str)) + ' hours ago',
+        'like_count': like_count,
+        'dislike_count': dislike_count,
+        'subscriber_count': subscriber_count,
+        'hours ago posted': rng.integers(1, 72, rows),
+        'total_interactions': np.nan_to_num(view_count).astype(int) + like_count + dislike_count,
+        'video_url': 'https://api.bitchute.com/video/' + ids
+    })
+
+def write_synthetic_data(data_directory, rows, seed=0):
+    '''
+    Writes one synthetic dash_csv_{category}.csv per dashboard category into data_directory.
+    '''
+    os.makedirs(data_directory, exist_ok=True)
+    for offset, file_name in enumerate(category_files.values()):
+        make_synthetic_category(rows, seed + offset).to_csv(os.path.join(data_directory, file_name), index=False)
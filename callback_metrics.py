@@ -0,0 +1,203 @@
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+import numpy as np
+from dash import no_update
+from plotly.io.json import to_json_plotly
+
+class Samples():
+    '''
+    Most recent `size` values of one measurement, summarised as percentiles.
+    '''
+    def __init__(self, size=1024):
+        self.values = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value):
+        self.values.append(value)
+        self.count += 1
+
+    def summary(self):
+        if not self.values:
+            return {'count': self.count}
+        p50, p95, p99 = np.percentile(np.fromiter(self.values, float), [50, 95, 99])
+        return {'count': self.count, 'p50': round(p50, 3), 'p95': round(p95, 3), 'p99': round(p99, 3), 'max': round(max(self.values), 3)}
+
+class SamplingProfiler():
+    '''
+    Samples the stacks of threads running a profiled callback every `interval` seconds and
+    writes calls slower than `threshold` seconds to `directory` as collapsed stacks
+    ("outer;inner count" per line), the input format of flamegraph.pl and speedscope.
+    '''
+    def __init__(self, directory, threshold, interval=0.005):
+        self.directory = directory
+        self.threshold = threshold
+        self.interval = interval
+        self.active = {}
+        self.lock = threading.Lock()
+        self.sampler = None
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                active = list(self.active.items())
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, stacks in active:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                if stack:
+                    stacks[';'.join(reversed(stack))] += 1
+
+    @contextmanager
+    def profile(self, name):
+        thread_id = threading.get_ident()
+        stacks = Counter()
+        with self.lock:
+            self.active[thread_id] = stacks
+            if self.sampler is None:
+                self.sampler = threading.Thread(target=self._run, name='callback-profiler', daemon=True)
+                self.sampler.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.active.pop(thread_id, None)
+            if elapsed >= self.threshold and stacks:
+                self.dump(name, elapsed, stacks)
+
+    def dump(self, name, elapsed, stacks):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{int(elapsed * 1000)}ms.folded")
+        with open(path, 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"Slow callback {name} took {elapsed * 1000:.0f} ms, stacks written to {path}")
+
+class CallbackMetrics():
+    '''
+    Per-process latency, stage timing and payload size measurements of Dash callbacks.
+
+    Callbacks are wrapped with `instrument`. Code they call marks its expensive parts with
+    `stage(name)`; stages that run outside a callback (e.g. warming the view model cache)
+    are recorded under 'background'. `summary()` is what /metrics returns.
+    '''
+    def __init__(self, sample_size=1024, profiler=None, payload_every=20):
+        self.sample_size = sample_size
+        self.profiler = profiler
+        self.payload_every = payload_every
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.calls = Counter()
+        self.errors = Counter()
+        self.category_hits = Counter()
+        self.latency = defaultdict(self._samples)
+        self.stages = defaultdict(lambda: defaultdict(self._samples))
+        self.output_bytes = defaultdict(lambda: defaultdict(self._samples))
+
+    def _samples(self):
+        return Samples(self.sample_size)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            callback = getattr(self.local, 'callback', None) or 'background'
+            with self.lock:
+                self.stages[callback][name].add(elapsed)
+
+    def hit(self, category):
+        with self.lock:
+            self.category_hits[category] += 1
+
+    def instrument(self, name, output_ids):
+        '''
+        Decorator recording the latency of a callback and the serialized size of each output.
+        Sizing serializes the outputs a second time, so only every `payload_every`-th call of a
+        callback is sized (the first one included); 0 turns sizing off.
+
+        Parameters:
+        name (str): Name the callback is reported under.
+        output_ids (list): 'component.property' of each output, in the callback's return order.
+        '''
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                self.local.callback = name
+                start = time.perf_counter()
+                try:
+                    if self.profiler:
+                        with self.profiler.profile(name):
+                            result = func(*args, **kwargs)
+                    else:
+                        result = func(*args, **kwargs)
+                except Exception:
+                    with self.lock:
+                        self.errors[name] += 1
+                    raise
+                finally:
+                    self.local.callback = None
+                elapsed = (time.perf_counter() - start) * 1000
+                with self.lock:
+                    self.calls[name] += 1
+                    self.latency[name].add(elapsed)
+                    sized = self.payload_every and (self.calls[name] - 1) % self.payload_every == 0
+                if sized:
+                    # Same encoder Dash uses for the response, so these are the bytes sent per output
+                    serialize_start = time.perf_counter()
+                    values = result if len(output_ids) > 1 else [result]
+                    sizes = {output_id: len(to_json_plotly(value)) for output_id, value in zip(output_ids, values)
+                             if not isinstance(value, type(no_update))}
+                    serialize_elapsed = (time.perf_counter() - serialize_start) * 1000
+                    with self.lock:
+                        self.stages[name]['serialization'].add(serialize_elapsed)
+                        for output_id, size in sizes.items():
+                            self.output_bytes[name][output_id].add(size)
+                return result
+            return wrapper
+        return decorator
+
+    def summary(self):
+        with self.lock:
+            return {
+                'pid': os.getpid(),
+                'callbacks': {name: {
+                    'calls': self.calls[name],
+                    'errors': self.errors[name],
+                    'latency_ms': self.latency[name].summary(),
+                    'stages_ms': {stage: samples.summary() for stage, samples in self.stages[name].items()},
+                    'output_bytes': {output_id: samples.summary() for output_id, samples in self.output_bytes[name].items()}
+                } for name in self.calls},
+                'background_stages_ms': {stage: samples.summary() for stage, samples in self.stages['background'].items()},
+                'category_hits': dict(self.category_hits)
+            }
+
+def metrics_from_environment(script_dir):
+    '''
+    Creates the app's CallbackMetrics. Setting CALLBACK_PROFILE_MS turns on the sampling
+    profiler for callbacks slower than that many milliseconds; stacks are written to
+    CALLBACK_PROFILE_DIR (cache/profiles by default). CALLBACK_PAYLOAD_EVERY sets how often
+    output sizes are measured (every 20th call by default, 1 for every call, 0 for never).
+    '''
+    profiler = None
+    threshold = os.environ.get('CALLBACK_PROFILE_MS')
+    if threshold:
+        directory = os.environ.get('CALLBACK_PROFILE_DIR', os.path.join(script_dir, 'cache', 'profiles'))
+        interval = float(os.environ.get('CALLBACK_PROFILE_INTERVAL_MS', '5')) / 1000
+        profiler = SamplingProfiler(directory, float(threshold) / 1000, interval)
+    return CallbackMetrics(profiler=profiler, payload_every=int(os.environ.get('CALLBACK_PAYLOAD_EVERY', '20')))
@@ -1,6 +1,8 @@
+import dash
 from dash import Output, Input, State
 import plotly.graph_objects as go
 import json
+import math
 
 def make_standard_page_callback_params(graph_id, params_section_id, message_section_id):
     message_callback_output = Output(message_section_id, "children")
@@ -30,3 +32,91 @@ def register_callbacks(app):
             fig = go.Figure()
             message = f"Error updating graph: {e}"
         return fig, message
+
+def make_windowed_graph_callback_params(graph_id, params_section_id, message_section_id):
+    # Same sections as the standard page, but driven by the graph's own zoom/pan. The figure and
+    # message are also set by the page callback, hence allow_duplicate.
+    outputs = [Output(graph_id, "figure", allow_duplicate=True), Output(message_section_id, "children", allow_duplicate=True)]
+    inputs = [Input(graph_id, "relayoutData")]
+    states = [State(params_section_id, "children"), State(graph_id, "figure")]
+    return outputs, inputs, states
+
+def relayout_x_range(relayout_data):
+    '''
+    Returns the (low, high) x range of a relayoutData event, 'reset' for an autorange
+    (double click / reset axes), or None if the event did not touch the x axis.
+    '''
+    if not relayout_data:
+        return None
+    if relayout_data.get('xaxis.autorange'):
+        return 'reset'
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        return relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']
+    if 'xaxis.range' in relayout_data:
+        return tuple(relayout_data['xaxis.range'][:2])
+    return None
+
+def register_windowed_graph_callback(app, graph_id, params_section_id, message_section_id, build_window, window_size, instrument=None):
+    '''
+    Serves a categorical x axis one window of points at a time.
+
+    The figure's layout.meta records the window it holds ({'start', 'end', 'stride', 'total'},
+    in absolute point ranks). Zooming inside that window is left to the browser; zooming or
+    panning past its edges asks `build_window(params, start, end)` for the covering window,
+    and resetting the axes goes back to the first `window_size` points.
+
+    Parameters:
+    build_window (callable): (params dict, start, end) -> (figure, message).
+    window_size (int): Number of points in the initial window.
+    instrument (callable): Optional decorator applied to the callback, e.g. for metrics.
+    '''
+    outputs, inputs, states = make_windowed_graph_callback_params(graph_id, params_section_id, message_section_id)
+
+    def update_window(relayout_data, params_json, figure):
+        x_range = relayout_x_range(relayout_data)
+        if x_range is None or not params_json or not figure:
+            return dash.no_update, dash.no_update
+        meta = figure.get('layout', {}).get('meta') or {}
+        current_start, current_end = meta.get('start', 0), meta.get('end', window_size)
+        stride, total = meta.get('stride', 1), meta.get('total', current_end)
+        if x_range == 'reset':
+            start, end = 0, min(total, window_size)
+        else:
+            # Axis positions are indexes into the points on screen, each stride ranks apart
+            try:
+                low, high = float(x_range[0]), float(x_range[1])
+            except (TypeError, ValueError):
+                return dash.no_update, dash.no_update
+            start = current_start + int(math.floor(low)) * stride
+            end = current_start + int(math.ceil(high) + 1) * stride
+            start, end = max(0, start), min(total, end)
+            if current_start <= start and end <= current_end:
+                # Still inside the window that was sent, nothing to fetch
+                return dash.no_update, dash.no_update
+        if (start, end) == (current_start, current_end):
+            return dash.no_update, dash.no_update
+        return build_window(json.loads(params_json), start, end)
+
+    if instrument:
+        update_window = instrument(update_window)
+    return app.callback(outputs, inputs, states, prevent_initial_call=True)(update_window)
+
+def register_style_toggle(app, selector_id, styles, hidden_style=None):
+    '''
+    Shows and hides components from the value of a selector (e.g. a dropdown) in the browser,
+    without a request to the server.
+
+    Parameters:
+    styles (dict): component id -> {selector value: style while that value is selected}.
+    hidden_style (dict): Style for every other value, {'display': 'none'} by default.
+    '''
+    hidden_style = hidden_style or {'display': 'none'}
+    component_ids = list(styles)
+    function = f"""
+    function(value) {{
+        const styles = {json.dumps([styles[component_id] for component_id in component_ids])};
+        const hidden = {json.dumps(hidden_style)};
+        return styles.map(style => style[value] || hidden);
+    }}
+    """
+    app.clientside_callback(function, [Output(component_id, "style") for component_id in component_ids], Input(selector_id, "value"))
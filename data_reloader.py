@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from data_store import category_files, load_category, read_manifest, store_directory
+
+# Immutable view of the loaded data. Readers take one snapshot per request, so a reload that
+# swaps in a new snapshot can never hand them a half-built frame or a mix of two versions.
+Snapshot = namedtuple('Snapshot', ['version', 'loaded_at', 'categories', 'category_versions', 'category_loaded_at'])
+
+class CategoryRegistry():
+    '''
+    Holds the loaded categories and swaps in reloaded ones atomically under a version number.
+
+    `version` increases on every swap, `category_versions[category]` only when that category
+    changes, so caches can be keyed on the latter and keep entries for untouched categories.
+    '''
+    def __init__(self, categories):
+        now = time.time()
+        self._snapshot = Snapshot(1, now, dict(categories), {category: 1 for category in categories}, {category: now for category in categories})
+        self.lock = threading.Lock()
+        self.listeners = []
+
+    def snapshot(self):
+        return self._snapshot
+
+    @property
+    def categories(self):
+        return self._snapshot.categories
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def on_swap(self, listener):
+        # listener(categories, snapshot) runs on the reloader thread after every swap, with the
+        # list of categories that swap replaced
+        self.listeners.append(listener)
+
+    def replace_many(self, values):
+        '''
+        Swaps in several reloaded categories as one new snapshot, so listeners run once for all of them.
+
+        Parameters:
+        values (dict): category -> (agg_df, duration_view_counts, search_index).
+        '''
+        with self.lock:
+            old = self._snapshot
+            now = time.time()
+            version = old.version + 1
+            categories = dict(old.categories)
+            categories.update(values)
+            category_versions = dict(old.category_versions)
+            category_versions.update({category: version for category in values})
+            category_loaded_at = dict(old.category_loaded_at)
+            category_loaded_at.update({category: now for category in values})
+            self._snapshot = Snapshot(version, now, categories, category_versions, category_loaded_at)
+            snapshot = self._snapshot
+        for listener in self.listeners:
+            try:
+                listener(list(values), snapshot)
+            except Exception as e:
+                print(f"Reload listener failed for {', '.join(values)}: {e}")
+        return snapshot
+
+    def describe(self):
+        snapshot = self._snapshot
+        return {
+            'version': snapshot.version,
+            'loaded_at': snapshot.loaded_at,
+            'categories': {category: {'version': snapshot.category_versions[category], 'loaded_at': snapshot.category_loaded_at[category], 'rows': len(value[0])}
+                           for category, value in snapshot.categories.items()}
+        }
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+class DataReloader(threading.Thread):
+    '''
+    Background thread that watches the data directory and reloads categories whose CSV file or
+    columnar store changed.
+
+    A change is only loaded once the file has stopped changing for one polling interval, so a
+    CSV that the scraper is still writing is not picked up half-written. Loading happens on this
+    thread, off the request path; a load that fails keeps the previous data.
+    '''
+    def __init__(self, registry, data_directory, interval=10.0):
+        super().__init__(name='data-reloader', daemon=True)
+        self.registry = registry
+        self.data_directory = data_directory
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.loaded = self.signatures()
+        self.pending = {}
+
+    def signatures(self):
+        manifest_signature = file_signature(os.path.join(store_directory(self.data_directory), 'manifest.json'))
+        return {category: (file_signature(os.path.join(self.data_directory, file_name)), manifest_signature)
+                for category, file_name in category_files.items()}
+
+    def poll(self):
+        current = self.signatures()
+        manifest = None
+        # Everything loaded in this poll is swapped in together; a store rebuild changes every category
+        loaded = {}
+        for category, signature in current.items():
+            if signature == self.loaded.get(category) or signature[0] is None and category not in self.registry.categories:
+                self.pending.pop(category, None)
+                continue
+            if self.pending.get(category) != signature:
+                # Changed since the last poll, wait for it to settle
+                self.pending[category] = signature
+                continue
+            if manifest is None:
+                manifest = read_manifest(self.data_directory)
+            try:
+                value = load_category(self.data_directory, category, manifest)
+            except Exception as e:
+                print(f"Reload of {category} failed, keeping the loaded data: {e}")
+                continue
+            finally:
+                self.pending.pop(category, None)
+            self.loaded[category] = signature
+            if value is not None:
+                loaded[category] = value
+        if loaded:
+            snapshot = self.registry.replace_many(loaded)
+            print(f"Reloaded {', '.join(loaded)} (data version {snapshot.version})")
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Data reloader error: {e}")
+
+    def stop(self):
+        self.stopped.set()
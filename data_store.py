@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import resource
+import tempfile
+import numpy as np
+import pandas as pd
+from description_store import DescriptionStore
+from preprocessing import preprocess_data
+from search_index import SearchIndex
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None  # The dashboard still runs from the CSV files, only slower to start
+
+# Preprocessed CSV written by the scraper notebook for every dashboard category
+category_files = {
+    'sports': 'dash_csv_sports.csv',
+    'health': 'dash_csv_health.csv',
+    'entertainment': 'dash_csv_entertainment.csv',
+    'education': 'dash_csv_education.csv',
+    'automotive': 'dash_csv_automotive.csv',
+    'business': 'dash_csv_business.csv',
+    'news': 'dash_csv_news.csv'
+}
+
+# Bump whenever preprocess_data output or the stored layout changes so stores built by older code are treated as stale
+store_format = 4
+count_columns = ['view_count', 'like_count', 'dislike_count', 'subscriber_count', 'Total Interactions', 'Net Likes']
+
+def store_directory(data_directory):
+    return os.path.join(data_directory, 'store')
+
+def source_signature(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def read_manifest(data_directory):
+    try:
+        with open(os.path.join(store_directory(data_directory), 'manifest.json')) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('format') != store_format:
+        return None
+    return manifest
+
+def narrow_counts(df, columns):
+    # int32 halves the memory of the count columns; keep int64 if a value would not fit
+    limits = np.iinfo(np.int32)
+    for column in columns:
+        if column in df.columns and df[column].between(limits.min, limits.max).all():
+            df[column] = df[column].astype('int32')
+    return df
+
+# Columns that are only used as text; kept as Arrow strings instead of Python objects when pyarrow is installed
+string_columns = ['title', 'hashtags', 'id']
+
+def compact_frame(agg_df):
+    '''
+    In-memory layout of a category frame: categorical channel, int32 counts, Arrow strings,
+    no video_url (see preprocessing.video_urls) and no description (kept in the DescriptionStore
+    of the search index).
+    '''
+    agg_df = agg_df.drop(columns=['description', 'video_url'], errors='ignore')
+    agg_df['channel'] = agg_df['channel'].astype('category')
+    if pa is not None:
+        for column in string_columns:
+            agg_df[column] = agg_df[column].astype(pd.StringDtype('pyarrow'))
+    return narrow_counts(agg_df, count_columns)
+
+def write_atomically(path, write):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def write_table(df, path):
+    table = df if isinstance(df, pa.Table) else pa.Table.from_pandas(df, preserve_index=False)
+
+    def write(tmp_path):
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    write_atomically(path, write)
+
+def read_table(path):
+    # Memory-mapped so every worker shares the page cache for the numeric and categorical buffers.
+    # Strings become Arrow-backed pandas strings, which point into the mapping instead of being copied.
+    source = pa.memory_map(path, 'r')
+    return pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True, types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get)
+
+def read_descriptions(path):
+    source = pa.memory_map(path, 'r')
+    return DescriptionStore(pa.ipc.open_file(source).read_all().column('description'))
+
+def read_search_index(path, agg_df, descriptions):
+    # The postings stay in the mapping, so loading does not tokenize a single title or description
+    source = pa.memory_map(path, 'r')
+    return SearchIndex.from_table(pa.ipc.open_file(source).read_all(), agg_df, descriptions)
+
+def build_store(data_directory):
+    '''
+    Writes the preprocessed frames and search index postings of every category to Arrow IPC files.
+
+    Parameters:
+    data_directory (str): Directory holding the dash_csv_{category}.csv files.
+
+    Returns:
+    manifest: Dict recording the source file signature of every category written.
+    '''
+    if pa is None:
+        raise RuntimeError('pyarrow is required to build the columnar data store')
+    directory = store_directory(data_directory)
+    os.makedirs(directory, exist_ok=True)
+    manifest = {'format': store_format, 'categories': {}}
+    for category, file_name in category_files.items():
+        source_path = os.path.join(data_directory, file_name)
+        if not os.path.exists(source_path):
+            print(f"Skipping {category}: {source_path} not found")
+            continue
+        signature = source_signature(source_path)
+        result = preprocess_data(pd.read_csv(source_path))
+        if result is None:
+            continue
+        agg_df, duration_view_counts, search_index = result
+        write_table(compact_frame(agg_df), os.path.join(directory, f'{category}.arrow'))
+        write_table(pd.DataFrame({'description': agg_df['description'].astype(object).where(agg_df['description'].notna(), None)}),
+                    os.path.join(directory, f'{category}_descriptions.arrow'))
+        write_table(narrow_counts(duration_view_counts.copy(), ['view_count']), os.path.join(directory, f'{category}_durations.arrow'))
+        write_table(search_index.to_table(), os.path.join(directory, f'{category}_index.arrow'))
+        manifest['categories'][category] = {'source': file_name, **signature}
+        print(f"Stored {category}: {len(agg_df)} rows")
+
+    def write(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    write_atomically(os.path.join(directory, 'manifest.json'), write)
+    return manifest
+
+def is_fresh(data_directory, category, manifest):
+    if pa is None or manifest is None or category not in manifest['categories']:
+        return False
+    directory = store_directory(data_directory)
+    for suffix in ('', '_durations', '_descriptions', '_index'):
+        if not os.path.exists(os.path.join(directory, f'{category}{suffix}.arrow')):
+            return False
+    entry = manifest['categories'][category]
+    source_path = os.path.join(data_directory, entry['source'])
+    if not os.path.exists(source_path):
+        return True  # Nothing newer to fall back to
+    signature = source_signature(source_path)
+    return signature['size'] == entry['size'] and signature['mtime_ns'] == entry['mtime_ns']
+
+def load_category(data_directory, category, manifest=None):
+    '''
+    Loads one category as (agg_df, duration_view_counts, search_index).
+
+    Reads the memory-mapped store when it is up to date with the CSV file, otherwise
+    preprocesses the CSV file. Returns None if neither is usable.
+    '''
+    if is_fresh(data_directory, category, manifest):
+        directory = store_directory(data_directory)
+        agg_df = read_table(os.path.join(directory, f'{category}.arrow'))
+        duration_view_counts = read_table(os.path.join(directory, f'{category}_durations.arrow'))
+        descriptions = read_descriptions(os.path.join(directory, f'{category}_descriptions.arrow'))
+        search_index = read_search_index(os.path.join(directory, f'{category}_index.arrow'), agg_df, descriptions)
+        return agg_df, duration_view_counts, search_index
+
+    source_path = os.path.join(data_directory, category_files[category])
+    if not os.path.exists(source_path):
+        print(f"Error: no data found for category '{category}'")
+        return None
+    print(f"Data store missing or stale for {category}, reading {source_path}")
+    result = preprocess_data(pd.read_csv(source_path))
+    if result is None:
+        return None
+    agg_df, duration_view_counts, search_index = result
+    return compact_frame(agg_df), duration_view_counts, search_index
+
+def load_categories(data_directory):
+    manifest = read_manifest(data_directory)
+    categories = {category: load_category(data_directory, category, manifest) for category in category_files}
+    return {k: v for k, v in categories.items() if v is not None}
+
+def memory_report(categories):
+    '''
+    Memory held by each loaded category, for sizing gunicorn workers.
+
+    Parameters:
+    categories (dict): category -> (agg_df, duration_view_counts, search_index), as loaded.
+
+    Returns:
+    report: Dict of category -> {'rows', 'frame_bytes', 'column_bytes', 'durations_bytes',
+    'descriptions_bytes', 'index_bytes', 'index_tokens'}, plus the process' peak resident size under
+    'peak_rss_bytes'. Memory-mapped columns, descriptions and postings are counted in full although
+    workers share their pages.
+    '''
+    report = {'categories': {}}
+    for category, (agg_df, duration_view_counts, search_index) in categories.items():
+        column_bytes = agg_df.memory_usage(deep=True, index=False)
+        report['categories'][category] = {
+            'rows': len(agg_df),
+            'frame_bytes': int(column_bytes.sum()),
+            'column_bytes': {column: int(size) for column, size in column_bytes.items()},
+            'durations_bytes': int(duration_view_counts.memory_usage(deep=True).sum()),
+            'descriptions_bytes': int(search_index.descriptions.nbytes),
+            'index_bytes': int(search_index.nbytes),
+            'index_tokens': len(search_index)
+        }
+    # ru_maxrss is in kilobytes on Linux
+    report['peak_rss_bytes'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return report
+
+def print_memory_report(report):
+    print(f"{'category':<16}{'rows':>8}{'frame MB':>10}{'descr. MB':>11}{'index MB':>10}{'tokens':>9}  largest columns")
+    for category, entry in report['categories'].items():
+        largest = sorted(entry['column_bytes'].items(), key=lambda item: -item[1])[:3]
+        print(f"{category:<16}{entry['rows']:>8}{entry['frame_bytes'] / 2 ** 20:>10.2f}{entry['descriptions_bytes'] / 2 ** 20:>11.2f}{entry['index_bytes'] / 2 ** 20:>10.2f}{entry['index_tokens']:>9}  "
+              + ', '.join(f"{column} {size / 2 ** 20:.2f}" for column, size in largest))
+    print(f"Peak resident size of this process: {report['peak_rss_bytes'] / 2 ** 20:.1f} MB")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Builds the columnar data store from the dash_csv files.')
+    parser.add_argument('data_directory', nargs='?', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+    parser.add_argument('--memory', action='store_true', help='Load every category and print its memory use instead of building the store')
+    args = parser.parse_args()
+    if args.memory:
+        print_memory_report(memory_report(load_categories(args.data_directory)))
+    else:
+        build_store(args.data_directory)
@@ -0,0 +1,54 @@
+import zlib
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None  # Descriptions are kept zlib-compressed instead
+
+class DescriptionStore():
+    '''
+    Video descriptions of one category, kept out of the category frame because only search reads them.
+
+    With pyarrow the descriptions are one Arrow string array: memory-mapped from the data store,
+    so pages are only read (and shared between workers) when a substring search scans them, or
+    a compact in-memory array when the category was loaded from its CSV file. Keyword search
+    uses the stored index and does not read them. Without pyarrow every description is stored
+    zlib-compressed.
+    '''
+    def __init__(self, values):
+        self.values = values
+
+    @classmethod
+    def from_series(cls, descriptions):
+        descriptions = descriptions.where(descriptions.notna(), None)
+        if pa is not None:
+            return cls(pa.array(descriptions.tolist(), type=pa.string()))
+        return cls([None if text is None else zlib.compress(str(text).encode('utf-8')) for text in descriptions])
+
+    def __len__(self):
+        return len(self.values)
+
+    def texts(self):
+        # Every description as str ('' when missing), for building the search index. This reads the whole
+        # array, so it only runs in build_store and when a category is loaded from its CSV file.
+        if pa is not None and isinstance(self.values, (pa.Array, pa.ChunkedArray)):
+            return ('' if text is None else text for text in self.values.to_pylist())
+        return ('' if data is None else zlib.decompress(data).decode('utf-8') for data in self.values)
+
+    def contains(self, text):
+        '''
+        Returns a boolean array marking the descriptions that contain text, ignoring case.
+        '''
+        if pa is not None and isinstance(self.values, (pa.Array, pa.ChunkedArray)):
+            matches = pc.match_substring(self.values, pattern=text, ignore_case=True)
+            return pc.fill_null(matches, False).to_numpy(zero_copy_only=False)
+        text = text.upper()
+        return np.array([text in description.upper() for description in self.texts()], dtype=bool)
+
+    @property
+    def nbytes(self):
+        if pa is not None and isinstance(self.values, (pa.Array, pa.ChunkedArray)):
+            return self.values.nbytes
+        return sum(len(data) for data in self.values if data is not None)
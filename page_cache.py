@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+# Hours a cached page is served without asking the site again, per page type
+default_ttls = {
+    'search': 1,
+    'category': 1,
+    'hashtag': 6,
+    'channel': 24,
+    'video': 24,
+    'other': 24
+}
+
+def page_type(url):
+    # BitChute paths start with the page type: /video/{id}/, /channel/{id}/, /search/?query=...
+    parts = [part for part in urlparse(url).path.split('/') if part]
+    if parts and parts[0] in default_ttls:
+        return parts[0]
+    if parts and parts[0] == 'profile':
+        return 'channel'
+    return 'other'
+
+class PageNotCached(LookupError):
+    '''
+    Raised in offline mode for a page that was never cached.
+    '''
+
+class PageCache():
+    '''
+    On-disk cache of scraped pages, so interrupted scrapes and development reruns do not hit
+    the site again for pages already fetched.
+
+    Pages are stored content-addressed under objects/ (identical pages are stored once) and
+    looked up through one small JSON entry per URL under index/, holding the content hash,
+    when the page was fetched and its ETag/Last-Modified headers. A page older than the TTL
+    of its type is revalidated with a conditional request, so an unchanged page costs a 304.
+
+    In offline mode nothing is fetched: every page is served from the cache whatever its age,
+    and pages that were never cached raise PageNotCached.
+
+    Parameters:
+    directory (str): Cache directory.
+    ttls (dict): Page type -> hours, overrides default_ttls.
+    offline (bool): Replay from the cache only.
+    '''
+    def __init__(self, directory, ttls=None, offline=False):
+        self.directory = directory
+        self.ttls = dict(default_ttls, **(ttls or {}))
+        self.offline = offline
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.offline_misses = 0
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'index'), exist_ok=True)
+
+    def key(self, url, variant=None):
+        # variant tells apart different pages loaded from one URL, e.g. after clicking a tab
+        return url if variant is None else f'{url}#{variant}'
+
+    def index_path(self, key):
+        return os.path.join(self.directory, 'index', f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json")
+
+    def object_path(self, digest):
+        return os.path.join(self.directory, 'objects', f'{digest}.html')
+
+    def _count(self, counter):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _write(self, path, data):
+        # Atomic, so a crash never leaves a half-written page or entry behind
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def entry(self, url, variant=None):
+        try:
+            with open(self.index_path(self.key(url, variant))) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def read(self, entry):
+        try:
+            with open(self.object_path(entry['digest']), 'rb') as f:
+                return f.read().decode('utf-8')
+        except OSError:
+            return None
+
+    def is_fresh(self, entry, now=None):
+        now = now or time.time()
+        return now - entry['fetched_at'] < self.ttls[page_type(entry['url'])] * 3600
+
+    def store(self, url, text, variant=None, headers=None):
+        data = text.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        if not os.path.exists(self.object_path(digest)):
+            self._write(self.object_path(digest), data)
+        headers = headers or {}
+        entry = {
+            'url': url,
+            'variant': variant,
+            'digest': digest,
+            'fetched_at': time.time(),
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified')
+        }
+        self._write(self.index_path(self.key(url, variant)), json.dumps(entry).encode('utf-8'))
+        return entry
+
+    def touch(self, entry, headers=None):
+        # The site confirmed the cached page is current
+        entry = dict(entry, fetched_at=time.time())
+        headers = headers or {}
+        entry['etag'] = headers.get('ETag') or entry.get('etag')
+        entry['last_modified'] = headers.get('Last-Modified') or entry.get('last_modified')
+        self._write(self.index_path(self.key(entry['url'], entry.get('variant'))), json.dumps(entry).encode('utf-8'))
+
+    def cached(self, url, variant=None):
+        '''
+        Returns (text, entry) of a cached page that can be served as is, or (None, entry) when
+        it has to be fetched or revalidated first (entry is None if it was never cached).
+        '''
+        entry = self.entry(url, variant)
+        text = self.read(entry) if entry else None
+        if text is None:
+            if self.offline:
+                self._count('offline_misses')
+                raise PageNotCached(self.key(url, variant))
+            return None, None
+        if self.offline or self.is_fresh(entry):
+            self._count('hits')
+            return text, entry
+        return None, entry
+
+    def fetch(self, url, get):
+        '''
+        Returns the text of an HTTP page, from the cache when possible.
+
+        Parameters:
+        get (callable): get(url, headers) sends the request and returns a requests.Response.
+        '''
+        text, entry = self.cached(url)
+        if text is not None:
+            return text
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        response = get(url, headers)
+        if response.status_code == 304 and entry:
+            self.touch(entry, response.headers)
+            self._count('revalidated')
+            return self.read(entry)
+        response.raise_for_status()
+        self._count('misses')
+        self.store(url, response.text, headers=response.headers)
+        return response.text
+
+    def render(self, url, load, variant=None):
+        '''
+        Returns a page loaded through a browser, from the cache when it is still fresh.
+        Browser pages cannot be revalidated, a stale page is loaded again.
+
+        Parameters:
+        load (callable): Loads the page and returns its source.
+        '''
+        text, entry = self.cached(url, variant)
+        if text is not None:
+            return text
+        text = load()
+        self._count('misses')
+        self.store(url, text, variant)
+        return text
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'revalidated': self.revalidated, 'misses': self.misses, 'offline_misses': self.offline_misses}
@@ -0,0 +1,163 @@
+import argparse
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from data_store import category_files
+
+# Scraped category name (recent_videos_bitchute_{name}.csv) -> dashboard category
+scraped_categories = {
+    'Sports': 'sports',
+    'Health': 'health',
+    'Entertainment': 'entertainment',
+    'Education': 'education',
+    'Auto & Vehicles': 'automotive',
+    'Business & Finance': 'business',
+    'News': 'news'
+}
+
+stages = ['read', 'relative_time', 'clean', 'remove_duplicates', 'total_interactions', 'video_url', 'write']
+
+video_base = 'https://api.bitchute.com/video/'
+
+relative_time_pattern = re.compile(r'(\d+)\s*(hour|minute|day|week)s?', re.IGNORECASE)
+# Only lowercase units count, like the notebook's `'hour' in unit` checks
+unit_hours = {'hour': 1, 'minute': 1, 'day': 24, 'week': 24 * 7}
+unit_divisors = {'minute': 60}
+
+def scraped_file(name):
+    return f'recent_videos_bitchute_{name}.csv'
+
+def hours_ago_posted(created_at):
+    '''
+    Vectorized convert_relative_time_to_hours from the notebook: '1 day, 3 hours ago' -> 27.
+
+    Missing (and non-string) values give NaN, strings without a time unit give 0. Only the
+    distinct strings are parsed and then broadcast back, since they repeat heavily. Like the
+    notebook's .apply, the result is int64 unless a value is missing or a minute was parsed.
+    '''
+    codes, uniques = pd.factorize(created_at)
+    texts = pd.Series(uniques, dtype=object)
+    texts = texts.where(texts.map(lambda value: isinstance(value, str)))
+    texts = texts.str.replace(',', '').str.replace('Â', '').str.strip()
+    matches = texts.str.extractall(relative_time_pattern)
+    hours = np.zeros(len(uniques))
+    if not matches.empty:
+        # number / 60 rather than number * (1 / 60), so minutes round exactly like the notebook
+        per_match = matches[0].astype(float) * matches[1].map(unit_hours).fillna(0) / matches[1].map(unit_divisors).fillna(1)
+        totals = per_match.groupby(level=0).sum()
+        hours[totals.index.to_numpy()] = totals.to_numpy()
+    hours[texts.isna().to_numpy()] = np.nan
+    # Factorize marks missing values with -1, which picks the trailing NaN
+    result = np.append(hours, np.nan)[codes]
+    minutes = not matches.empty and (matches[1] == 'minute').any()
+    if not np.isnan(result).any() and not minutes:
+        return pd.Series(result.astype('int64'), index=created_at.index)
+    return pd.Series(result, index=created_at.index)
+
+def clean(df):
+    # The notebook's preprocess_data with the relative times already parsed
+    df = df.drop(columns=['rank', 'scrape_time'], errors='ignore')
+    df['hashtags'] = df['hashtags'].fillna('No Hashtags')
+    df['description'] = df['description'].fillna('No Description')
+    for column in ['view_count', 'like_count', 'dislike_count', 'subscriber_count']:
+        df[column] = df[column].fillna(0).astype(int)
+    return df
+
+def write_csv_atomic(df, path):
+    # Write to a temporary file next to the target and rename it, so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', newline='') as f:
+            df.to_csv(f, index=False)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def process_category(name, input_directory, output_directory):
+    '''
+    Cleans one scraped category and writes its dash_csv file.
+
+    Returns:
+    name, output path (None if there was no scraped file), rows written, seconds per stage
+    '''
+    timings = {}
+    start = time.perf_counter()
+
+    def lap(stage):
+        nonlocal start
+        now = time.perf_counter()
+        timings[stage] = now - start
+        start = now
+
+    input_path = os.path.join(input_directory, scraped_file(name))
+    if not os.path.exists(input_path):
+        return name, None, 0, timings
+    df = pd.read_csv(input_path)
+    lap('read')
+    hours = hours_ago_posted(df['created_at'])
+    lap('relative_time')
+    df = clean(df)
+    df['hours ago posted'] = hours
+    lap('clean')
+    if 'id' in df.columns:
+        df = df.drop_duplicates(subset='id')
+    lap('remove_duplicates')
+    df['total_interactions'] = df['like_count'] + df['dislike_count'] + df['view_count']
+    lap('total_interactions')
+    if 'id' in df.columns:
+        df['video_url'] = video_base + df['id'].astype(str)
+    lap('video_url')
+    output_path = os.path.join(output_directory, category_files[scraped_categories[name]])
+    write_csv_atomic(df, output_path)
+    lap('write')
+    return name, output_path, len(df), timings
+
+def run_pipeline(input_directory, output_directory=None, names=None, processes=None):
+    '''
+    Cleans and exports every scraped category, one category per process.
+
+    Parameters:
+    input_directory (str): Directory holding the recent_videos_bitchute_{name}.csv files.
+    output_directory (str): Where the dash_csv_{category}.csv files are written, input_directory by default.
+    names (list): Scraped category names to process, all of scraped_categories by default.
+    processes (int): Size of the process pool, one per category (up to the CPU count) by default.
+
+    Returns:
+    results: List of (name, output path, rows, seconds per stage), in the order of names.
+    '''
+    output_directory = output_directory or input_directory
+    names = names or list(scraped_categories)
+    os.makedirs(output_directory, exist_ok=True)
+    processes = processes or min(len(names), os.cpu_count() or 1)
+    start = time.perf_counter()
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(process_category, names, [input_directory] * len(names), [output_directory] * len(names)))
+    else:
+        results = [process_category(name, input_directory, output_directory) for name in names]
+    print_timings(results, time.perf_counter() - start)
+    return results
+
+def print_timings(results, elapsed):
+    print(f"{'category':<22}{'rows':>8}" + ''.join(f'{stage + " ms":>{len(stage) + 5}}' for stage in stages))
+    for name, output_path, rows, timings in results:
+        if output_path is None:
+            print(f"{name:<22}  skipped, {scraped_file(name)} not found")
+            continue
+        print(f"{name:<22}{rows:>8}" + ''.join(f"{timings.get(stage, 0) * 1000:>{len(stage) + 5}.1f}" for stage in stages))
+    print(f"Wrote {sum(1 for result in results if result[1])} files in {elapsed:.2f} s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cleans the scraped recent_videos_bitchute CSV files and writes the dash_csv files the dashboard reads.')
+    parser.add_argument('input_directory', nargs='?', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+    parser.add_argument('--output', help='Directory for the dash_csv files (default: the input directory)')
+    parser.add_argument('--categories', nargs='+', choices=list(scraped_categories), help='Only process these scraped categories')
+    parser.add_argument('--processes', type=int, help='Process pool size (default: one per category, up to the CPU count)')
+    args = parser.parse_args()
+    run_pipeline(args.input_directory, args.output, args.categories, args.processes)
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+from search_index import SearchIndex
+
+required_columns = ['view_count', 'like_count', 'dislike_count', 'title', 'hashtags', 'channel', 'id', 'subscriber_count', 'description', 'duration']
+count_columns = ['view_count', 'like_count', 'dislike_count', 'subscriber_count']
+sum_columns = ['view_count', 'like_count', 'dislike_count']
+first_columns = ['hashtags', 'channel', 'id', 'subscriber_count', 'description']
+
+# Video URLs are not kept in the frames, they are rebuilt from the id like the notebook's add_video_url
+video_base = 'https://api.bitchute.com/video/'
+
+# mm:ss or h:mm:ss, as shown on BitChute video cards
+duration_pattern = r'^\s*(?:(\d+):)?(\d+):(\d+)\s*$'
+
+def video_urls(ids):
+    return video_base + ids.astype(str)
+
+def coerce_counts(df):
+    for column in count_columns:
+        df[column] = df[column].fillna(0).astype(int)
+    return df
+
+def parse_durations(durations):
+    # Convert duration to total minutes; anything not in a known format counts as 0.
+    # Durations repeat heavily, so only the distinct strings are parsed and then broadcast back.
+    codes, uniques = pd.factorize(durations.fillna('0:00').astype(str))
+    parts = pd.Series(uniques).str.extract(duration_pattern).astype(float)
+    minutes = (parts[0].fillna(0) * 60 + parts[1] + parts[2] / 60).fillna(0).to_numpy()
+    return pd.Series(minutes[codes], index=durations.index)
+
+def aggregate_titles(df):
+    # Aggregate by video title, summing views and averaging duration
+    grouped = df.groupby('title')
+    agg_df = pd.concat([
+        grouped[sum_columns].sum(),
+        grouped['duration'].mean(),
+        grouped[first_columns].first()
+    ], axis=1)
+    agg_df = agg_df[sum_columns + ['duration'] + first_columns].reset_index()
+    agg_df['Total Interactions'] = agg_df['view_count'] + agg_df['like_count'] + agg_df['dislike_count']
+    # Add 'Net Likes' column
+    agg_df['Net Likes'] = agg_df['like_count'] - agg_df['dislike_count']
+    return agg_df
+
+def top_video_per_channel(agg_df):
+    # Keep one video per channel, the one with the highest subscriber count. Only the subscriber
+    # column is sorted (same algorithm as before, so ties resolve identically) and the frame is
+    # gathered once instead of being fully sorted and then de-duplicated.
+    order = agg_df['subscriber_count'].sort_values(ascending=False).index
+    channels = agg_df['channel'].reindex(order)
+    return agg_df.loc[order[~channels.duplicated().to_numpy()]]
+
+def bucket_durations(agg_df):
+    # Categorize duration into 3-minute intervals, equivalent to pd.cut over range(0, max + 3, 3) with right=False
+    edges = range(0, int(agg_df['duration'].max()) + 3, 3)
+    labels = [f'{i}-{i+3}' for i in edges[:-1]]
+    codes = np.floor(agg_df['duration'].to_numpy() / 3)
+    codes = np.where((codes >= 0) & (codes < len(labels)), codes, -1).astype(int)
+    agg_df['duration_category'] = pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+    # Aggregate the view counts by duration intervals
+    valid = codes >= 0
+    totals = np.bincount(codes[valid], weights=agg_df['view_count'].to_numpy()[valid], minlength=len(labels))
+    duration_view_counts = pd.DataFrame({
+        'duration_category': pd.Categorical(labels, categories=labels, ordered=True),
+        'view_count': totals.astype(agg_df['view_count'].dtype)
+    })
+    return agg_df, duration_view_counts
+
+def preprocess_data(df):
+    print("Preprocessing data")
+    # Check if the necessary columns are present
+    for column in required_columns:
+        if column not in df.columns:
+            print(f"Error: Column '{column}' not found in DataFrame")
+            return None
+
+    df = coerce_counts(df)
+    df['duration'] = parse_durations(df['duration'])
+    agg_df = aggregate_titles(df)
+    agg_df = top_video_per_channel(agg_df)
+    agg_df, duration_view_counts = bucket_durations(agg_df)
+
+    # Inverted index over title and description for the keyword search
+    search_index = SearchIndex(agg_df)
+
+    return agg_df, duration_view_counts, search_index
@@ -0,0 +1,81 @@
+import json
+from collections import namedtuple
+import pandas as pd
+from term_stats import split_hashtags
+
+# Dropdown value and API name of the combined view over every category
+all_categories = 'all'
+
+measure_columns = ['view_count', 'like_count', 'dislike_count', 'Total Interactions', 'Net Likes']
+
+# Rollups of one data version. `records` holds the JSON-ready rows of every
+# (rollup name, category or 'all') pair so the API answers with a dictionary lookup.
+Rollups = namedtuple('Rollups', ['version', 'combined', 'channels', 'durations', 'hashtags', 'channel_totals', 'duration_totals', 'records'])
+
+def combine_categories(categories):
+    '''
+    Concatenates the loaded category frames into one frame with a 'category' column.
+
+    Parameters:
+    categories (dict): category -> (agg_df, duration_view_counts, search_index).
+    '''
+    frames = [agg_df.assign(category=category) for category, (agg_df, duration_view_counts, search_index) in categories.items()]
+    combined = pd.concat(frames, ignore_index=True)
+    combined['category'] = pd.Categorical(combined['category'], categories=list(categories))
+    # Each frame has its own channel categories and duration buckets, so rebuild them over the union
+    combined['channel'] = combined['channel'].astype(str).astype('category')
+    buckets = sorted(combined['duration_category'].dropna().astype(str).unique(), key=lambda label: int(label.split('-')[0]))
+    combined['duration_category'] = pd.Categorical(combined['duration_category'].astype(str), categories=buckets, ordered=True)
+    for column in measure_columns:
+        combined[column] = combined[column].astype('int64')
+    return combined
+
+def explode_hashtags(combined):
+    hashtags = split_hashtags(combined['hashtags'])
+    return combined.loc[hashtags.index, ['category', 'view_count']].assign(hashtag=hashtags.to_numpy())
+
+def measure_sums(grouped):
+    return grouped.agg(videos=('view_count', 'size'), **{column: (column, 'sum') for column in measure_columns})
+
+def to_records(df):
+    # to_json turns numpy scalars into plain JSON numbers
+    return json.loads(df.to_json(orient='records'))
+
+def build_rollups(categories, version):
+    '''
+    Builds the combined dataset and its rollups by (category, channel), (category, duration
+    bucket) and (category, hashtag), plus their totals over all categories.
+    '''
+    combined = combine_categories(categories)
+
+    channels = measure_sums(combined.groupby(['category', 'channel'], observed=True))
+    channels['subscriber_count'] = combined.groupby(['category', 'channel'], observed=True)['subscriber_count'].max()
+    channels = channels.reset_index().sort_values(['category', 'Total Interactions'], ascending=[True, False], kind='stable')
+    channel_totals = channels.groupby('channel', observed=True).agg(
+        videos=('videos', 'sum'), categories=('category', 'nunique'), subscriber_count=('subscriber_count', 'max'),
+        **{column: (column, 'sum') for column in measure_columns}
+    ).reset_index().sort_values('Total Interactions', ascending=False, kind='stable').reset_index(drop=True)
+
+    durations = combined.groupby(['category', 'duration_category'], observed=True).agg(videos=('view_count', 'size'), view_count=('view_count', 'sum')).reset_index()
+    duration_totals = durations.groupby('duration_category', observed=True).agg(videos=('videos', 'sum'), view_count=('view_count', 'sum')).reset_index()
+
+    hashtag_rows = explode_hashtags(combined)
+    hashtags = hashtag_rows.groupby(['category', 'hashtag'], observed=True).agg(videos=('view_count', 'size'), view_count=('view_count', 'sum')).reset_index()
+    hashtags = hashtags.sort_values(['category', 'videos', 'view_count'], ascending=[True, False, False], kind='stable')
+    hashtag_totals = hashtags.groupby('hashtag').agg(videos=('videos', 'sum'), view_count=('view_count', 'sum')).reset_index()
+    hashtag_totals = hashtag_totals.sort_values(['videos', 'view_count'], ascending=False, kind='stable')
+
+    category_totals = measure_sums(combined.groupby('category', observed=True))
+    category_totals['channels'] = combined.groupby('category', observed=True)['channel'].nunique()
+    category_totals = category_totals.reset_index().sort_values('view_count', ascending=False, kind='stable')
+
+    records = {
+        ('channels', all_categories): to_records(channel_totals),
+        ('durations', all_categories): to_records(duration_totals),
+        ('hashtags', all_categories): to_records(hashtag_totals),
+        ('categories', all_categories): to_records(category_totals)
+    }
+    for name, rollup in (('channels', channels), ('durations', durations), ('hashtags', hashtags)):
+        for category, rows in rollup.groupby('category', observed=True):
+            records[(name, category)] = to_records(rows.drop(columns='category'))
+    return Rollups(version, combined, channels, durations, hashtags, channel_totals, duration_totals, records)
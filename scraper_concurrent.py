@@ -0,0 +1,214 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from scraper_parsing import parse_video_details
+
+class RateLimiter():
+    '''
+    Spaces out requests so that no more than `rate` start per second.
+    '''
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time)
+            self.next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+class HostLimiter():
+    '''
+    Per-host concurrency and rate limits.
+
+    Parameters:
+    concurrency (int): Default number of requests allowed in flight per host.
+    rate (float): Default number of requests started per second per host, None for no limit.
+    overrides (dict): host -> {'concurrency': int, 'rate': float} for hosts that need other limits.
+    '''
+    def __init__(self, concurrency=4, rate=2.0, overrides=None):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.overrides = overrides or {}
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def _limits(self, host):
+        with self.lock:
+            if host not in self.hosts:
+                limits = self.overrides.get(host, {})
+                self.hosts[host] = (threading.BoundedSemaphore(limits.get('concurrency', self.concurrency)),
+                                    RateLimiter(limits.get('rate', self.rate)))
+            return self.hosts[host]
+
+    @contextmanager
+    def limit(self, url):
+        semaphore, rate_limiter = self._limits(urlparse(url).netloc)
+        with semaphore:
+            rate_limiter.wait()
+            yield
+
+class WebDriverPool():
+    '''
+    Bounded pool of reused WebDriver instances for pages that only render with JavaScript.
+
+    Drivers are created lazily with `factory` (e.g. Crawler.new_webdriver) up to `size`, and
+    callers block until one is free instead of starting a new Chrome per page.
+    '''
+    def __init__(self, factory, size=2):
+        self.factory = factory
+        self.size = size
+        self.idle = queue.Queue()
+        self.created = 0
+        self.drivers = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def driver(self):
+        try:
+            wd = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                create = self.created < self.size
+                if create:
+                    self.created += 1
+            if create:
+                try:
+                    wd = self.factory()
+                except Exception:
+                    with self.lock:
+                        self.created -= 1
+                    raise
+                with self.lock:
+                    self.drivers.append(wd)
+            else:
+                wd = self.idle.get()
+        try:
+            yield wd
+        finally:
+            self.idle.put(wd)
+
+    def close(self):
+        with self.lock:
+            drivers, self.drivers = self.drivers, []
+            self.created = 0
+        for wd in drivers:
+            try:
+                wd.quit()
+            except Exception:
+                pass
+        self.idle = queue.Queue()
+
+def needs_javascript(details):
+    # Server-rendered video pages carry the counters; without a like count that parses, the page was a JS shell
+    like_count = details[0]
+    return not isinstance(like_count, int)
+
+class DetailFetcher():
+    '''
+    Fetches video details concurrently.
+
+    Pages are fetched over a pooled requests.Session. Pages whose details show they need
+    JavaScript to render (see `needs_javascript`) are loaded again through a bounded
+    WebDriverPool if a `driver_factory` is given. `video_base` can point at a local stub server for testing.
+
+    Parameters:
+    video_base (str): Base URL of video pages, the video id and a '/' are appended.
+    max_workers (int): Size of the worker thread pool.
+    concurrency (int): Requests in flight per host.
+    rate (float): Requests started per second per host, None for no limit.
+    host_overrides (dict): Per-host limits, see HostLimiter.
+    driver_factory (callable): Returns a new WebDriver, None to never use Selenium.
+    driver_pool_size (int): Maximum number of WebDriver instances.
+    timeout (float): HTTP timeout in seconds.
+    page_cache (PageCache): Serve pages from this cache and revalidate them, see page_cache.py.
+    '''
+    def __init__(self, video_base='https://api.bitchute.com/video/', max_workers=8, concurrency=4, rate=2.0, host_overrides=None,
+                 driver_factory=None, driver_pool_size=2, timeout=20, verbose=False, page_cache=None):
+        self.video_base = video_base
+        self.page_cache = page_cache
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.verbose = verbose
+        self.limiter = HostLimiter(concurrency, rate, host_overrides)
+        self.session = requests.Session()
+        retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers, max_retries=retries)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.drivers = WebDriverPool(driver_factory, driver_pool_size) if driver_factory else None
+
+    def get(self, url, headers=None):
+        with self.limiter.limit(url):
+            return self.session.get(url, timeout=self.timeout, headers=headers)
+
+    def fetch(self, url):
+        if self.page_cache:
+            # Only misses and revalidations reach the site and count against the host limits
+            return self.page_cache.fetch(url, self.get)
+        response = self.get(url)
+        response.raise_for_status()
+        return response.text
+
+    def render(self, url):
+        if self.page_cache:
+            return self.page_cache.render(url, lambda: self.load(url), variant='rendered')
+        return self.load(url)
+
+    def load(self, url):
+        with self.limiter.limit(url):
+            with self.drivers.driver() as wd:
+                wd.get(url)
+                try:
+                    from selenium.webdriver.common.by import By
+                    from selenium.webdriver.support import expected_conditions
+                    from selenium.webdriver.support.ui import WebDriverWait
+                    # Wait for the counters instead of sleeping a fixed time
+                    WebDriverWait(wd, self.timeout).until(expected_conditions.presence_of_element_located((By.ID, 'video-like-count')))
+                except Exception:
+                    pass
+                return wd.page_source
+
+    def get_video_details(self, video_id):
+        url = f"{self.video_base}{video_id}/"
+        if self.verbose:
+            print(f"Retrieving: {url}")
+        details = parse_video_details(self.fetch(url))
+        if self.drivers and needs_javascript(details):
+            details = parse_video_details(self.render(url))
+        return details
+
+    def get_many(self, video_ids):
+        '''
+        Fetches the details of several videos on the worker pool.
+
+        Returns:
+        details: Dict of video id -> (like_count, dislike_count, subscriber_count, hashtags).
+        Videos that failed are left out and reported.
+        '''
+        details = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.get_video_details, video_id): video_id for video_id in video_ids}
+            for future in as_completed(futures):
+                video_id = futures[future]
+                try:
+                    details[video_id] = future.result()
+                except Exception as e:
+                    print(f"Failed for video with id {video_id}: {e}")
+        return details
+
+    def close(self):
+        self.session.close()
+        if self.drivers:
+            self.drivers.close()
@@ -0,0 +1,264 @@
+from html import escape
+import markdownify
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    import lxml.html
+except ImportError:
+    lxml = None  # Fall back to the BeautifulSoup backend
+
+# 'lxml' parses in C and only walks the nodes the scraper reads; 'soup' is the original
+# BeautifulSoup html.parser implementation, kept as the reference for parity checks. lxml is
+# opt-in: so far it has only been checked against the stub server's hand-written pages.
+backends = ['lxml', 'soup'] if lxml else ['soup']
+default_backend = 'soup'
+
+def process_views(views):
+    if "k" in views or "K" in views:
+        views = views.replace('K', '').replace('k', '')
+        if '.' not in views:
+            views = views[:-1] + '.' + views[-1:]
+        views = float(views) * 1000
+    elif "m" in views or "M" in views:
+        views = views.replace('M', '').replace('m', '')
+        if '.' in views:
+            views = float(views)
+        else:
+            views = float(views) / 10
+        views = views * 1000000
+    return int(views)
+
+def parse_count(text):
+    try:
+        return int(text.replace(',', ''))
+    except ValueError:
+        return text
+
+def is_not_found(h1_text):
+    return h1_text is not None and ("404 - Page not found" in h1_text or "404 - PAGE NOT FOUND" in h1_text)
+
+# lxml helpers mirroring BeautifulSoup's find(class_=...), find(id=...) and find(tag) on descendants
+xpaths = {}
+
+def _xpath(expression):
+    if expression not in xpaths:
+        xpaths[expression] = etree.XPath(expression)
+    return xpaths[expression]
+
+def find_all(element, class_=None, id=None, tag='*'):
+    if class_:
+        return _xpath(f".//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_} ')]")(element)
+    if id:
+        return _xpath(f".//{tag}[@id='{id}']")(element)
+    return _xpath(f".//{tag}")(element)
+
+def find(element, class_=None, id=None, tag='*'):
+    matches = find_all(element, class_, id, tag)
+    return matches[0] if matches else None
+
+def text(element):
+    return element.text_content()
+
+def inner_html(element):
+    # Same markup BeautifulSoup's decode_contents() produces for markdownify
+    parts = [escape(element.text, quote=False) if element.text else '']
+    parts.extend(etree.tostring(child, method='html', encoding=str, with_tail=True) for child in element)
+    return ''.join(parts)
+
+def parse_html(src):
+    return lxml.html.document_fromstring(src) if src.strip() else lxml.html.document_fromstring('<html></html>')
+
+def parse_video_details(src, backend=None):
+    '''
+    Extracts the engagement details shown on a video page.
+
+    Parameters:
+    src (str): HTML of https://api.bitchute.com/video/{id}/
+    backend (str): 'lxml' or 'soup' (the default).
+
+    Returns:
+    like_count, dislike_count, subscriber_count, hashtags
+    '''
+    backend = backend or default_backend
+    like_count = None
+    dislike_count = None
+    subscriber_count = None
+    hashtags = []
+
+    if backend == 'lxml':
+        root = parse_html(src)
+        if find(root, class_='video-like') is not None:
+            like_count = parse_count(text(find(root, id='video-like-count')).strip())
+        if find(root, class_='video-dislike') is not None:
+            dislike_count = parse_count(text(find(root, id='video-dislike-count')).strip())
+        if find(root, class_='subscriber-count') is not None:
+            subscriber_count = parse_count(text(find(root, id='subscriber_count')).strip())
+        video_hashtags_element = find(root, id='video-hashtags')
+        if video_hashtags_element is not None:
+            hashtags = [text(tag).strip() for tag in find_all(video_hashtags_element, tag='li')]
+        return like_count, dislike_count, subscriber_count, hashtags
+
+    soup = BeautifulSoup(src, 'html.parser')
+
+    if soup.find(class_='video-like'):
+        like_count = parse_count(soup.find(id='video-like-count').text.strip())
+
+    if soup.find(class_='video-dislike'):
+        dislike_count = parse_count(soup.find(id='video-dislike-count').text.strip())
+
+    if soup.find(class_='subscriber-count'):
+        subscriber_count = parse_count(soup.find(id='subscriber_count').text.strip())
+
+    video_hashtags_element = soup.find(id='video-hashtags')
+    if video_hashtags_element:
+        for tag in video_hashtags_element.find_all('li'):
+            hashtags.append(tag.text.strip())
+
+    return like_count, dislike_count, subscriber_count, hashtags
+
+def parse_video_ids(src, backend=None):
+    '''
+    Returns the ids of the videos listed on a search or category page.
+    '''
+    backend = backend or default_backend
+    video_ids = []
+    if backend == 'lxml':
+        root = parse_html(src)
+        if find(root, class_='results-list') is not None:
+            for result in find_all(root, class_='video-result-container'):
+                title = find(result, class_='video-result-title')
+                if title is not None:
+                    video_ids.append(find(title, tag='a').get('href').split('/')[-2])
+        return video_ids
+
+    soup = BeautifulSoup(src, 'html.parser')
+    if soup.find(class_='results-list'):
+        for result in soup.find_all(class_='video-result-container'):
+            if result.find(class_='video-result-title'):
+                video_id = result.find(class_='video-result-title').find('a').get('href').split('/')[-2]
+                video_ids.append(video_id)
+    return video_ids
+
+def parse_search_results(src, scrape_time, backend=None):
+    '''
+    Extracts the video records of a search, category or hashtag page.
+
+    Returns:
+    videos: List of [rank, id, title, hashtags, view_count, duration, channel, channel_id,
+    description, description_links, created_at, scrape_time], or None for a 404 page.
+    '''
+    backend = backend or default_backend
+    if backend == 'lxml':
+        return _parse_search_results_lxml(src, scrape_time)
+    return _parse_search_results_soup(src, scrape_time)
+
+def _parse_search_results_lxml(src, scrape_time):
+    root = parse_html(src)
+    h1 = find(root, tag='h1')
+    if h1 is not None and is_not_found(text(h1)):
+        return None
+
+    videos = []
+    if find(root, class_='results-list') is None:
+        return videos
+    for counter, result in enumerate(find_all(root, class_='video-result-container'), start=1):
+        title = None
+        id_ = None
+        view_count = None
+        duration = None
+        channel = None
+        channel_id = None
+        description = None
+        description_links = []
+        created_at = None
+        hashtags = []
+
+        element = find(result, class_='video-result-title')
+        if element is not None:
+            title = text(element).strip('\n').strip()
+            id_ = find(element, tag='a').get('href').split('/')[-2]
+
+        element = find(result, class_='video-views')
+        if element is not None:
+            view_count = process_views(text(element).strip('\n').strip())
+
+        element = find(result, class_='video-duration')
+        if element is not None:
+            duration = text(element).strip('\n').strip()
+
+        element = find(result, class_='video-result-channel')
+        if element is not None:
+            channel = text(element).strip('\n').strip()
+            channel_id = find(element, tag='a').get('href').split('/')[-2]
+
+        element = find(result, class_='video-result-text')
+        if element is not None:
+            description = markdownify.markdownify(inner_html(element).strip('\n'))
+            description_links = [link.get('href') for link in find_all(element, tag='a')]
+
+        element = find(result, class_='video-result-details')
+        if element is not None:
+            created_at = text(element).strip('\n').strip()
+
+        element = find(result, id='video-hashtags')
+        if element is not None:
+            hashtags = [text(tag).strip() for tag in find_all(element, tag='li')]
+
+        videos.append([counter, id_, title, hashtags, view_count, duration, channel, channel_id, description, description_links, created_at, scrape_time])
+    return videos
+
+def _parse_search_results_soup(src, scrape_time):
+    soup = BeautifulSoup(src, 'html.parser')
+    if soup.find('h1') and is_not_found(soup.find('h1').text):
+        return None
+
+    videos = []
+    if soup.find(class_='results-list'):
+        counter = 0
+        for result in soup.find_all(class_='video-result-container'):
+            counter += 1
+            title = None
+            id_ = None
+            view_count = None
+            duration = None
+            channel = None
+            channel_id = None
+            description = None
+            description_links = []
+            created_at = None
+            hashtags = []
+
+            if result.find(class_='video-result-title'):
+                title = result.find(class_='video-result-title').text.strip('\n').strip()
+                id_ = result.find(class_='video-result-title').find('a').get('href').split('/')[-2]
+
+            if result.find(class_='video-views'):
+                view_count = process_views(result.find(class_='video-views').text.strip('\n').strip())
+
+            if result.find(class_='video-duration'):
+                duration = result.find(class_='video-duration').text.strip('\n').strip()
+
+            if result.find(class_='video-result-channel'):
+                channel = result.find(class_='video-result-channel').text.strip('\n').strip()
+                channel_id = result.find(class_='video-result-channel').find('a').get('href').split('/')[-2]
+
+            if result.find(class_='video-result-text'):
+                description = result.find(class_='video-result-text').decode_contents()
+                description = description.strip('\n')
+                description = markdownify.markdownify(description)
+
+                for link in result.find(class_='video-result-text').find_all('a'):
+                    description_links.append(link.get('href'))
+
+            if result.find(class_='video-result-details'):
+                created_at = result.find(class_='video-result-details').text.strip('\n').strip()
+
+            if result.find(id='video-hashtags'):
+                video_hashtags_element = result.find(id='video-hashtags')
+                if video_hashtags_element:
+                    for tag in video_hashtags_element.find_all('li'):
+                        hashtags.append(tag.text.strip())
+
+            videos.append([counter, id_, title, hashtags, view_count, duration, channel, channel_id, description, description_links, created_at, scrape_time])
+    return videos
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+import pandas as pd
+
+class ScrapeState():
+    '''
+    Persistent record of when each video's details were last fetched and what they were.
+
+    Stored as JSON: {category: {video id: {'fetched_at': unix time, 'hash': sha256 of the details}}}.
+    Used by the incremental scrape to re-fetch only new videos and videos older than a TTL.
+    Videos are tracked per category because each category's details are saved in its own file,
+    so a video fetched for one category still has to be fetched for another.
+    '''
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.categories = json.load(f)
+        except (OSError, ValueError):
+            self.categories = {}
+        # Files from before freshness was kept per category map ids straight to fetches; they are
+        # dropped, so the next run fetches everything once
+        self.categories = {category: videos for category, videos in self.categories.items() if 'fetched_at' not in videos}
+
+    def stale_ids(self, category, video_ids, ttl_hours=24, now=None):
+        '''
+        Returns the ids that were never fetched for category or were fetched more than ttl_hours ago.
+        '''
+        now = now or time.time()
+        cutoff = now - ttl_hours * 3600
+        videos = self.categories.get(category, {})
+        return [video_id for video_id in video_ids
+                if video_id not in videos or videos[video_id]['fetched_at'] < cutoff]
+
+    def record(self, category, video_id, details, fetched_at=None):
+        '''
+        Records a fetch for category. Returns True if the details differ from the previous fetch.
+        '''
+        digest = content_hash(details)
+        videos = self.categories.setdefault(category, {})
+        previous = videos.get(video_id)
+        videos[video_id] = {'fetched_at': fetched_at or time.time(), 'hash': digest}
+        return previous is None or previous['hash'] != digest
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.categories, f)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, self.path)
+
+def content_hash(details):
+    return hashlib.sha256(json.dumps(details, default=str, sort_keys=True).encode('utf-8')).hexdigest()
+
+def upsert(existing, updates, key='id'):
+    '''
+    Merges freshly scraped rows into an existing dataset.
+
+    Rows in `updates` replace rows of `existing` with the same id, keeping the existing value
+    wherever the update has none (e.g. details that were not re-fetched this run). Ids only in
+    `existing` are kept. Duplicates are then removed like the notebook's remove_duplicates:
+    first occurrence per id wins, and updates come first.
+    '''
+    if existing is None or existing.empty:
+        return updates.drop_duplicates(subset=key)
+    known = existing.drop_duplicates(subset=key).set_index(key)
+    updates = updates.copy()
+    for column in updates.columns:
+        if column != key and column in known.columns:
+            fallback = updates[key].map(known[column])
+            updates[column] = updates[column].where(updates[column].notna(), fallback)
+    return pd.concat([updates, existing], ignore_index=True).drop_duplicates(subset=key)
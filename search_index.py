@@ -0,0 +1,166 @@
+import re
+import numpy as np
+import pandas as pd
+from text_processing import tokenize
+from description_store import DescriptionStore
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None  # Tokens are kept in a sorted numpy array instead
+
+phrase_pattern = re.compile(r'"([^"]*)"')
+
+def parse_query(query):
+    '''
+    Splits a search string into phrases and single terms.
+
+    Quoted parts ("joe biden") are phrases whose tokens must appear next to each other,
+    every other token is a term that must appear somewhere in the title or description.
+
+    Returns:
+    phrases: List of token lists.
+    terms: List of tokens.
+    '''
+    phrases = [tokenize(phrase) for phrase in phrase_pattern.findall(query)]
+    phrases = [phrase for phrase in phrases if phrase]
+    terms = tokenize(phrase_pattern.sub(' ', query))
+    return phrases, terms
+
+def build_postings(fields):
+    '''
+    Tokenizes every text and sorts the occurrences by token, row, field and position.
+
+    Parameters:
+    fields (list): One iterable of texts per field, each with one text per row.
+
+    Returns:
+    tokens: Sorted distinct tokens.
+    offsets: Start of the postings of every token, plus the total number of postings.
+    rows, fields, positions: Row, field number and token position of every posting.
+    '''
+    tokens, rows, field_numbers, positions = [], [], [], []
+    for field, texts in enumerate(fields):
+        for row, text in enumerate(texts):
+            words = tokenize(text)
+            tokens.extend(words)
+            rows.extend([row] * len(words))
+            field_numbers.extend([field] * len(words))
+            positions.extend(range(len(words)))
+    codes, uniques = pd.factorize(pd.Series(tokens, dtype=object), sort=True)
+    rows = np.array(rows, dtype=np.int32)
+    field_numbers = np.array(field_numbers, dtype=np.int8)
+    positions = np.array(positions, dtype=np.int32)
+    order = np.lexsort((positions, field_numbers, rows, codes))
+    offsets = np.zeros(len(uniques) + 1, dtype=np.int32)
+    np.cumsum(np.bincount(codes, minlength=len(uniques)), out=offsets[1:])
+    return np.asarray(uniques, dtype=object), offsets, rows[order], field_numbers[order], positions[order]
+
+class SearchIndex():
+    '''
+    Token-level inverted index over the title and description of every row of a category frame.
+
+    The postings are flat arrays sorted by token: the occurrences of the i-th token are
+    rows/fields/positions[offsets[i]:offsets[i + 1]], so both AND and phrase queries are answered
+    without scanning the frame. to_table/from_table store them as Arrow list columns, one row
+    per token, which the data store memory-maps instead of tokenizing every text again.
+    Matches are returned ordered by 'Total Interactions', highest first.
+    '''
+    fields = ('title', 'description')
+
+    def __init__(self, df, descriptions=None, postings=None):
+        # Descriptions live in a side store that substring search also reads, see DescriptionStore
+        self.descriptions = descriptions if descriptions is not None else DescriptionStore.from_series(df['description'])
+        self.size = len(df)
+        if postings is None:
+            postings = build_postings([df['title'].fillna('').astype(str), self.descriptions.texts()])
+            if pa is not None:
+                postings = (pa.array(postings[0], type=pa.string()),) + postings[1:]
+        self.tokens, self.offsets, self.rows, self.field_numbers, self.positions = postings
+
+        # Rank of every row by total interactions, so results can be ordered without re-sorting the frame
+        order = df['Total Interactions'].reset_index(drop=True).sort_values(ascending=False, kind='stable').index.to_numpy()
+        self.rank = np.empty(self.size, dtype=np.int64)
+        self.rank[order] = np.arange(self.size)
+
+    @classmethod
+    def from_table(cls, table, df, descriptions):
+        # Zero-copy views of a table written by to_table, e.g. memory-mapped from the data store
+        columns = {name: column.chunk(0) if column.num_chunks == 1 else column.combine_chunks() for name, column in zip(table.column_names, table.columns)}
+        postings = columns['rows']
+        return cls(df, descriptions, (columns['token'], postings.offsets.to_numpy(), postings.values.to_numpy(),
+                                      columns['fields'].values.to_numpy(), columns['positions'].values.to_numpy()))
+
+    def to_table(self):
+        offsets = pa.array(self.offsets, type=pa.int32())
+        return pa.table({
+            'token': self.tokens,
+            'rows': pa.ListArray.from_arrays(offsets, pa.array(self.rows, type=pa.int32())),
+            'fields': pa.ListArray.from_arrays(offsets, pa.array(self.field_numbers, type=pa.int8())),
+            'positions': pa.ListArray.from_arrays(offsets, pa.array(self.positions, type=pa.int32()))
+        })
+
+    def __len__(self):
+        return len(self.tokens)
+
+    @property
+    def nbytes(self):
+        if pa is not None and isinstance(self.tokens, (pa.Array, pa.ChunkedArray)):
+            token_bytes = self.tokens.nbytes
+        else:
+            token_bytes = self.tokens.nbytes + sum(len(token) for token in self.tokens)
+        return token_bytes + sum(array.nbytes for array in (self.offsets, self.rows, self.field_numbers, self.positions, self.rank))
+
+    def _token_number(self, token):
+        if pa is not None and isinstance(self.tokens, (pa.Array, pa.ChunkedArray)):
+            return pc.index(self.tokens, token).as_py()
+        number = np.searchsorted(self.tokens, token)
+        return number if number < len(self.tokens) and self.tokens[number] == token else -1
+
+    def _postings(self, number):
+        return slice(self.offsets[number], self.offsets[number + 1])
+
+    def _phrase_rows(self, candidates, phrase, numbers):
+        # Key every occurrence by (row, field, position the phrase would start at); a phrase
+        # matches where every one of its tokens has the same key
+        keys = None
+        for offset, token in enumerate(phrase):
+            postings = self._postings(numbers[token])
+            rows, positions = self.rows[postings], self.positions[postings]
+            keep = np.isin(rows, candidates) & (positions >= offset)
+            token_keys = ((rows[keep].astype(np.int64) * 2 + self.field_numbers[postings][keep]) << 32) + positions[keep] - offset
+            keys = np.unique(token_keys) if keys is None else np.intersect1d(keys, token_keys)
+            if not len(keys):
+                break
+        return np.unique(keys >> 33)
+
+    def search(self, query):
+        '''
+        Runs an AND/phrase query.
+
+        Returns:
+        rows: Matching row positions ordered by total interactions, or None if the query has no
+        indexable tokens (only stop words or punctuation) and cannot be answered by the index.
+        '''
+        phrases, terms = parse_query(query)
+        tokens = terms + [token for phrase in phrases for token in phrase]
+        if not tokens:
+            return None
+
+        numbers = {token: self._token_number(token) for token in set(tokens)}
+        if min(numbers.values()) < 0:
+            return []
+
+        # Intersect the rarest postings first to keep the candidate set small
+        candidates = None
+        for token in sorted(numbers, key=lambda token: self.offsets[numbers[token] + 1] - self.offsets[numbers[token]]):
+            rows = np.unique(self.rows[self._postings(numbers[token])])
+            candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+            if not len(candidates):
+                return []
+
+        for phrase in phrases:
+            candidates = self._phrase_rows(candidates, phrase, numbers)
+
+        return candidates[np.argsort(self.rank[candidates], kind='stable')].tolist()
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+from text_processing import punctuation_pattern, stop_words
+
+stat_columns = ['count', 'videos', 'views']
+
+def split_terms(titles):
+    '''
+    Vectorized tokenize(): one entry per title token, indexed by the row the title is in.
+    '''
+    tokens = titles.astype(object).fillna('').str.replace(punctuation_pattern, '', regex=True).str.lower().str.split().explode()
+    return tokens[tokens.notna() & ~tokens.isin(stop_words)]
+
+def split_hashtags(hashtags):
+    '''
+    One entry per hashtag, lowercased and indexed by its row. The hashtags column holds
+    '#a,#b,#c' strings, or 'No Hashtags' when the scraper found none.
+    '''
+    tags = hashtags.astype(object).fillna('').str.split(',').explode().str.strip().str.lower()
+    return tags[tags.str.startswith('#', na=False)]
+
+# Token positions per row in the 'first' column, so row * row_stride + rank orders tokens
+row_stride = 1 << 16
+
+def term_table(terms, view_count, positions=None):
+    # count: occurrences, videos: rows containing the term, views: total views of those rows,
+    # first: where the term first appears, as row * row_stride + its rank among the row's tokens,
+    # with rows numbered by positions when given.
+    # Terms are kept in order of first appearance, the order Counter.most_common breaks ties in.
+    codes, uniques = pd.factorize(terms.to_numpy())
+    rows = terms.index.to_numpy(dtype='int64')
+    count = np.bincount(codes, minlength=len(uniques))
+    # Each (row, term) pair once, however often the term repeats in the row
+    pairs = np.unique(rows * max(len(uniques), 1) + codes)
+    pair_rows, pair_codes = np.divmod(pairs, max(len(uniques), 1))
+    videos = np.bincount(pair_codes, minlength=len(uniques))
+    views = np.zeros(len(uniques), dtype='int64')
+    np.add.at(views, pair_codes, view_count.to_numpy(dtype='int64')[pair_rows])
+    first_index = np.unique(codes, return_index=True)[1]
+    first_rows = rows[first_index]
+    first = (first_rows if positions is None else positions[first_rows]) * row_stride + (first_index - np.searchsorted(rows, first_rows))
+    table = pd.DataFrame({'count': count, 'videos': videos, 'views': views, 'first': first}, index=pd.Index(uniques, dtype=object, name='term'))
+    return table.astype('int64')
+
+def differs(old, new):
+    # A value that became or stopped being missing is a change, missing on both sides is not
+    old_missing, new_missing = old.isna().to_numpy(), new.isna().to_numpy()
+    unequal = (old != new).fillna(False).to_numpy(dtype=bool)
+    return pd.Series((unequal & ~old_missing & ~new_missing) | (old_missing != new_missing), index=old.index)
+
+def update_table(table, removed, added, kept_rows):
+    '''
+    Returns table with the counts of removed rows taken out and those of added rows put in, or
+    None when the new first appearance of a term can't be told without a full recount.
+
+    Parameters:
+    kept_rows (Series): New position of each old row, by old position, for the rows whose
+    terms are unchanged.
+    '''
+    updated = table[stat_columns].sub(removed[stat_columns], fill_value=0).add(added[stat_columns], fill_value=0)
+    updated = updated[updated['count'] > 0]
+    old_first = table['first'].reindex(updated.index)
+    moved = kept_rows.reindex(old_first // row_stride).to_numpy() * row_stride + old_first.to_numpy() % row_stride
+    # A term whose first row went but which still appears in untouched rows first appears in one
+    # of those, and which one is only known to a recount
+    untouched = table['count'].reindex(updated.index, fill_value=0) - removed['count'].reindex(updated.index, fill_value=0)
+    if (np.isnan(moved) & (untouched > 0).to_numpy()).any():
+        return None
+    updated['first'] = np.fmin(moved, added['first'].reindex(updated.index).to_numpy())
+    return updated.astype('int64').sort_values('first', kind='stable')
+
+class TermStats():
+    '''
+    Title-token and hashtag statistics of one category, each a frame indexed by term with
+    'count' (occurrences), 'videos' (rows containing it) and 'views' (total views of those rows).
+    Terms are in order of first appearance, so ties rank as they did with Counter.most_common.
+
+    Tokens are the ones the word cloud uses (see text_processing.tokenize). `update` derives
+    the statistics of a reloaded frame by counting only the rows that were added, removed or
+    changed, instead of the whole corpus. It recounts everything when rows were reordered, or
+    when a term lost the row it first appeared in but is still in rows that did not change.
+    '''
+    key_columns = ['id', 'title', 'hashtags', 'view_count']
+
+    def __init__(self, terms, hashtags, rows=None):
+        self.terms = terms
+        self.hashtags = hashtags
+        self.rows = rows
+
+    @classmethod
+    def from_frame(cls, df):
+        rows = df[cls.key_columns].reset_index(drop=True)
+        terms, hashtags = cls.count(rows)
+        return cls(terms, hashtags, rows)
+
+    @staticmethod
+    def count(rows, positions=None):
+        return (term_table(split_terms(rows['title']), rows['view_count'], positions),
+                term_table(split_hashtags(rows['hashtags']), rows['view_count'], positions))
+
+    @classmethod
+    def combine(cls, stats):
+        # Statistics over several categories, e.g. for the All categories view, with terms in order of
+        # first appearance over the categories in turn
+        stats = list(stats)
+
+        def combine_tables(tables):
+            table = pd.concat(tables)[stat_columns].groupby(level=0, sort=False).sum()
+            table['first'] = np.arange(len(table), dtype='int64')
+            return table
+
+        return cls(combine_tables([item.terms for item in stats]), combine_tables([item.hashtags for item in stats]))
+
+    def update(self, df):
+        '''
+        Returns the statistics of df, a newer version of the frame these were counted from.
+        '''
+        rows = df[self.key_columns].reset_index(drop=True)
+        if self.rows is None or not rows['id'].is_unique or not self.rows['id'].is_unique:
+            return TermStats.from_frame(df)
+        merged = self.rows.rename_axis('position').reset_index().merge(rows.rename_axis('position').reset_index(), on='id', how='outer',
+                                                                        suffixes=('_old', '_new'), indicator=True)
+        both = merged['_merge'] == 'both'
+        title_changed = differs(merged['title_old'], merged['title_new'])
+        hashtags_changed = differs(merged['hashtags_old'], merged['hashtags_new'])
+        changed = both & (title_changed | hashtags_changed | differs(merged['view_count_old'], merged['view_count_new']))
+        removed = merged[(merged['_merge'] == 'left_only') | changed]
+        added = merged[(merged['_merge'] == 'right_only') | changed]
+        if removed.empty and added.empty:
+            return TermStats(self.terms, self.hashtags, rows)
+        # First appearances carry over only while the rows in both versions keep their order
+        kept = merged[both].sort_values('position_old')
+        if not kept['position_new'].is_monotonic_increasing:
+            return TermStats.from_frame(df)
+
+        def count_side(frame, suffix):
+            # First appearances are numbered by the rows' positions in that version
+            frame = frame.sort_values(f'position{suffix}')
+            side = pd.DataFrame({column: frame[f'{column}{suffix}'].to_numpy() for column in ['title', 'hashtags', 'view_count']}).fillna({'view_count': 0})
+            return self.count(side, frame[f'position{suffix}'].to_numpy(dtype='int64'))
+
+        def kept_rows(column_changed):
+            unchanged = kept[~column_changed[kept.index]]
+            return pd.Series(unchanged['position_new'].to_numpy(dtype='int64'), index=unchanged['position_old'].to_numpy(dtype='int64'))
+
+        removed_terms, removed_hashtags = count_side(removed, '_old')
+        added_terms, added_hashtags = count_side(added, '_new')
+        terms = update_table(self.terms, removed_terms, added_terms, kept_rows(title_changed))
+        hashtags = update_table(self.hashtags, removed_hashtags, added_hashtags, kept_rows(hashtags_changed))
+        if terms is None or hashtags is None:
+            return TermStats.from_frame(df)
+        return TermStats(terms, hashtags, rows)
+
+    def word_frequencies(self):
+        return self.terms['count'].to_dict()
+
+    def top_terms(self, n=15, by='count'):
+        # Ties in order of first appearance, like Counter.most_common
+        return self.terms.sort_values(by, ascending=False, kind='stable').head(n)[stat_columns]
+
+    def top_hashtags(self, n=15, by='videos'):
+        return self.hashtags.sort_values(by, ascending=False, kind='stable').head(n)[stat_columns]
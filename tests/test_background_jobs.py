@@ -0,0 +1,30 @@
+import multiprocessing
+import time
+import pytest
+from background_jobs import diskcache, render_once
+
+pytestmark = pytest.mark.skipif(diskcache is None, reason='needs dash[diskcache]')
+
+def hang():
+    time.sleep(60)
+
+def render_in_job(directory, render, timeout):
+    render_once(diskcache.Cache(directory), 'trends', 'news:abc', render, max_concurrent=1, timeout=timeout)
+
+def test_render_once_reuses_result(tmp_path):
+    cache = diskcache.Cache(str(tmp_path))
+    calls = []
+    for _ in range(2):
+        assert render_once(cache, 'trends', 'news:abc', lambda: calls.append(1) or 'view') == 'view'
+    assert len(calls) == 1
+
+def test_hung_render_frees_lock_and_slot(tmp_path):
+    job = multiprocessing.get_context('spawn').Process(target=render_in_job, args=(str(tmp_path), hang, 1))
+    start = time.monotonic()
+    job.start()
+    job.join(30)
+    assert job.exitcode == 1 and time.monotonic() - start < 30
+    cache = diskcache.Cache(str(tmp_path))
+    assert cache.get('trends:lock:news:abc') is None
+    # The only slot is free again (a missing key is a semaphore at its full value)
+    assert cache.get('trends:slots', 1) == 1
@@ -0,0 +1,25 @@
+import os
+import shutil
+from data_reloader import CategoryRegistry, DataReloader
+from data_store import build_store, category_files, load_categories, store_directory
+
+repo_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_store_rebuild_swaps_every_category_at_once(tmp_path):
+    for file_name in category_files.values():
+        shutil.copy(os.path.join(repo_directory, 'data', file_name), tmp_path)
+    build_store(str(tmp_path))
+    registry = CategoryRegistry(load_categories(str(tmp_path)))
+    swaps = []
+    registry.on_swap(lambda categories, snapshot: swaps.append((sorted(categories), snapshot.version)))
+    reloader = DataReloader(registry, str(tmp_path), interval=0)
+
+    # A rebuild rewrites the manifest, which every category's signature includes
+    manifest_path = os.path.join(store_directory(str(tmp_path)), 'manifest.json')
+    stat = os.stat(manifest_path)
+    os.utime(manifest_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    reloader.poll()  # Seen changing, waits for it to settle
+    assert swaps == []
+    reloader.poll()
+    assert swaps == [(sorted(category_files), 2)]
+    assert set(registry.snapshot().category_versions.values()) == {2}
@@ -0,0 +1,25 @@
+import glob
+import os
+import pytest
+from scraper_parsing import backends, parse_search_results, parse_video_details, parse_video_ids
+
+tests_directory = os.path.dirname(os.path.abspath(__file__))
+
+# The stub server's hand-written pages, plus any real pages captured into tests/fixtures/pages with
+# benchmarks/capture_pages.py (none are committed yet)
+fixture_paths = (sorted(glob.glob(os.path.join(tests_directory, 'fixtures', 'pages', '*.html')))
+                 + sorted(glob.glob(os.path.join(os.path.dirname(tests_directory), 'benchmarks', 'fixtures', '*.html'))))
+
+def parse(name, src, backend):
+    if name.startswith('video'):
+        return parse_video_details(src, backend)
+    return parse_search_results(src, '0', backend), parse_video_ids(src, backend)
+
+@pytest.mark.parametrize('backend', [backend for backend in backends if backend != 'soup'])
+@pytest.mark.parametrize('path', fixture_paths, ids=os.path.basename)
+def test_backend_matches_soup(path, backend):
+    # BeautifulSoup is the reference the faster backends must reproduce record for record
+    name = os.path.basename(path)
+    with open(path, encoding='utf-8') as f:
+        src = f.read()
+    assert parse(name, src, backend) == parse(name, src, 'soup')
@@ -0,0 +1,20 @@
+import json
+from scraper_state import ScrapeState
+
+def test_freshness_is_kept_per_category(tmp_path):
+    path = str(tmp_path / 'scrape_state.json')
+    state = ScrapeState(path)
+    state.record('News', 'a1', (1, 0, 10, ['#news']), fetched_at=1000)
+    state.save()
+    state = ScrapeState(path)
+    # A video fetched for News still has to be fetched for Health, whose file it is not in yet
+    assert state.stale_ids('News', ['a1', 'b2'], ttl_hours=1, now=2000) == ['b2']
+    assert state.stale_ids('Health', ['a1', 'b2'], ttl_hours=1, now=2000) == ['a1', 'b2']
+    assert state.stale_ids('News', ['a1'], ttl_hours=1, now=1000 + 3601) == ['a1']
+    assert not state.record('News', 'a1', (1, 0, 10, ['#news']))
+    assert state.record('Health', 'a1', (1, 0, 10, ['#news']))
+
+def test_state_from_before_categories_is_dropped(tmp_path):
+    path = tmp_path / 'scrape_state.json'
+    path.write_text(json.dumps({'a1': {'fetched_at': 1000, 'hash': 'abc'}}))
+    assert ScrapeState(str(path)).stale_ids('News', ['a1'], ttl_hours=1, now=1001) == ['a1']
@@ -0,0 +1,35 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+from search_index import SearchIndex
+
+def make_frame():
+    return pd.DataFrame({
+        'title': ['Market crash today', 'Crash of the market', None, 'Vaccine news', 'Market news: crash!'],
+        'description': ['stock market crash', None, 'market crash explained', 'No Description', 'world news'],
+        'Total Interactions': [10, 50, 30, 20, 40]
+    })
+
+@pytest.mark.parametrize('query, expected', [
+    ('market crash', [1, 4, 2, 0]),
+    ('"market crash"', [2, 0]),
+    ('"crash today" market', [0]),
+    ('news', [4, 3]),
+    ('"news market"', []),
+    ('missing', []),
+    ('the', None)
+])
+def test_search(query, expected):
+    assert SearchIndex(make_frame()).search(query) == expected
+
+def test_table_round_trip():
+    df = make_frame()
+    index = SearchIndex(df)
+    # Through an IPC buffer, as the data store writes and memory-maps it
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, index.to_table().schema) as writer:
+        writer.write_table(index.to_table())
+    loaded = SearchIndex.from_table(pa.ipc.open_file(sink.getvalue()).read_all(), df, index.descriptions)
+    assert len(loaded) == len(index) and loaded.nbytes == index.nbytes
+    for query in ['market crash', '"market crash"', 'news', 'vaccine "news"']:
+        assert loaded.search(query) == index.search(query)
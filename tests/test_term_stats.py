@@ -0,0 +1,86 @@
+from collections import Counter
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+from term_stats import TermStats
+from text_processing import tokenize
+
+def make_frame(string_dtype=object):
+    df = pd.DataFrame({
+        'id': ['a1', 'b2', 'c3', 'd4', 'e5'],
+        'title': ['Breaking: market crash!', 'Vaccine news today', 'Market update, vaccine news', None, 'Gold and crypto'],
+        'hashtags': ['#market,#news', 'No Hashtags', '#Vaccine,#news', '#gold', None],
+        'view_count': [100, 250, 40, 7, 0]
+    })
+    for column in ['id', 'title', 'hashtags']:
+        df[column] = df[column].astype(string_dtype)
+    return df
+
+def assert_same_stats(incremental, full):
+    # In the same order too, the order ties rank in
+    tm.assert_frame_equal(incremental.terms, full.terms, check_names=False)
+    tm.assert_frame_equal(incremental.hashtags, full.hashtags, check_names=False)
+
+def test_word_frequencies_match_tokenize():
+    df = make_frame()
+    expected = Counter(tokenize(' '.join(df['title'].dropna().tolist())))
+    assert list(TermStats.from_frame(df).word_frequencies().items()) == list(expected.items())
+
+def test_top_terms_break_ties_like_most_common():
+    df = make_frame()
+    # vaccine and news tie, as do today and market, and rank in the opposite order alphabetically
+    df.loc[0, 'title'] = 'Today: market crash!'
+    df.loc[4, 'title'] = 'Zinc and crypto vaccine news'
+    expected = Counter(tokenize(' '.join(df['title'].dropna().tolist()))).most_common(4)
+    assert list(TermStats.from_frame(df).top_terms(4)['count'].items()) == expected
+
+@pytest.mark.parametrize('string_dtype', [object, 'string[pyarrow]'])
+def test_update_matches_full_recount(string_dtype):
+    old = make_frame(string_dtype)
+    new = old.copy()
+    new.loc[0, 'view_count'] = 1000
+    new.loc[1, 'title'] = 'Election live'
+    # Rows removed and added
+    new = pd.concat([new.drop(index=2), pd.DataFrame({'id': ['f6'], 'title': ['Storm warning news'], 'hashtags': ['#storm'],
+                                                      'view_count': [9]}).astype({'id': new['id'].dtype, 'title': new['title'].dtype, 'hashtags': new['hashtags'].dtype})],
+                    ignore_index=True)
+    assert_same_stats(TermStats.from_frame(old).update(new), TermStats.from_frame(new))
+
+@pytest.mark.parametrize('string_dtype', [object, 'string[pyarrow]'])
+def test_update_counts_values_becoming_or_stopping_being_missing(string_dtype):
+    old = make_frame(string_dtype)
+    new = old.copy()
+    # value -> missing and missing -> value, in titles and hashtags
+    new.loc[0, 'title'] = None
+    new.loc[3, 'title'] = 'Gold rush'
+    new.loc[1, 'hashtags'] = None
+    new.loc[4, 'hashtags'] = '#crypto'
+    incremental = TermStats.from_frame(old).update(new)
+    assert_same_stats(incremental, TermStats.from_frame(new))
+    assert 'crash' not in incremental.terms.index
+    assert incremental.hashtags.loc['#crypto', 'videos'] == 1
+
+@pytest.mark.parametrize('change', ['first_row_removed', 'rows_reordered'])
+def test_update_recounts_when_first_appearances_move(change):
+    old = make_frame()
+    if change == 'first_row_removed':
+        # 'news' first appears in b2 and is still in the unchanged c3
+        new = old.drop(index=1).reset_index(drop=True)
+    else:
+        new = old.iloc[[2, 0, 1, 3, 4]].reset_index(drop=True)
+        new.loc[4, 'view_count'] = 5
+    assert_same_stats(TermStats.from_frame(old).update(new), TermStats.from_frame(new))
+
+def test_update_without_changes_keeps_stats():
+    df = make_frame('string[pyarrow]')
+    stats = TermStats.from_frame(df)
+    updated = stats.update(df.copy())
+    assert updated.terms is stats.terms and updated.hashtags is stats.hashtags
+
+def test_combine_sums_categories():
+    df = make_frame()
+    stats = TermStats.from_frame(df)
+    combined = TermStats.combine([stats, stats])
+    assert combined.terms.loc['news', 'count'] == 2 * stats.terms.loc['news', 'count']
+    assert np.array_equal(combined.hashtags.index, stats.hashtags.index)
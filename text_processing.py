@@ -0,0 +1,13 @@
+import re
+
+stop_words = set([
+    'is', 'the', 'and', 'for', 'or', 'of', 'to', 'in', 'a', 'an', 'that', 'it', 'on', 'with', 'as', 'this', 'by', 'from', 'at', 'but', 'not',
+    'no', 'hashtags', '2024','5','w', 'too','vs','you','its','car','are','just','what','why','about','were','they'
+])
+
+punctuation_pattern = re.compile(r'[^\w\s]')
+
+def tokenize(text):
+    # Same normalization the word cloud uses: strip punctuation, lowercase, drop stop words
+    words = punctuation_pattern.sub('', text).lower().split()
+    return [word for word in words if word not in stop_words]
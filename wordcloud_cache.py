@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from io import BytesIO
+from wordcloud import WordCloud
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Without file locks, workers may render the same image at the same time
+
+def render_wordcloud_png(word_freq, most_common_word, width=1600, height=800):
+    def color_func(word, *args, **kwargs):
+        return 'red' if word == most_common_word else 'white'
+
+    wordcloud = WordCloud(
+        width=width,
+        height=height,
+        background_color='rgba(0,0,0,0)',
+        mode='RGBA',
+        color_func=color_func
+    ).generate_from_frequencies(word_freq)
+
+    img = BytesIO()
+    wordcloud.to_image().save(img, format='PNG')
+    return img.getvalue()
+
+class WordCloudCache():
+    '''
+    Two-tier cache of rendered word cloud PNGs.
+
+    Images are keyed by a hash of the word frequencies and the render parameters. A bounded
+    LRU keeps recently used images in memory, and every image is also written to a shared
+    directory so all gunicorn workers reuse each other's renders. A render holds a lock file
+    per image, so workers asking for the same image at once wait for one render.
+
+    Every data reload renders new images, so the directory is pruned whenever an image is
+    written: images not used for `max_age_days` are removed, then the least recently used
+    ones until the directory fits in `max_disk_bytes`. Using an image refreshes its mtime.
+    '''
+    def __init__(self, directory, max_items=32, width=1600, height=800, max_disk_bytes=200 * 2 ** 20, max_age_days=30):
+        self.directory = directory
+        self.max_items = max_items
+        self.max_disk_bytes = max_disk_bytes
+        self.max_age_days = max_age_days
+        self.width = width
+        self.height = height
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, word_freq, most_common_word):
+        payload = json.dumps({
+            'words': sorted(word_freq.items()),
+            'highlight': most_common_word,
+            'width': self.width,
+            'height': self.height
+        }, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path(self, digest):
+        return os.path.join(self.directory, f'{digest}.png')
+
+    def _remember(self, digest, png):
+        with self.lock:
+            self.memory[digest] = png
+            self.memory.move_to_end(digest)
+            while len(self.memory) > self.max_items:
+                self.memory.popitem(last=False)
+
+    def _touch(self, digest):
+        # Marks the image as used so pruning in this or another worker keeps it
+        try:
+            os.utime(self.path(digest))
+        except OSError:
+            pass
+
+    def get_png(self, digest):
+        with self.lock:
+            png = self.memory.get(digest)
+            if png is not None:
+                self.memory.move_to_end(digest)
+                self.hits += 1
+        if png is not None:
+            self._touch(digest)
+            return png
+        try:
+            with open(self.path(digest), 'rb') as f:
+                png = f.read()
+        except OSError:
+            return None
+        with self.lock:
+            self.disk_hits += 1
+        self._touch(digest)
+        self._remember(digest, png)
+        return png
+
+    def prune(self, keep=None):
+        '''
+        Removes images unused for max_age_days, then the least recently used images until the
+        directory fits in max_disk_bytes. `keep` (a digest) is never removed.
+
+        Returns:
+        removed: Number of files removed.
+        '''
+        files = []
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path, entry.name))
+        now = time.time()
+        total = sum(size for mtime, size, path, name in files)
+        removed = 0
+        for mtime, size, path, name in sorted(files):
+            if name == f'{keep}.png':
+                continue
+            # Temporary and lock files are left over from renders that finished or died
+            expired = now - mtime > (3600 if name.endswith(('.tmp', '.lock')) else self.max_age_days * 86400)
+            if not expired and (total <= self.max_disk_bytes or not name.endswith('.png')):
+                continue
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def get_or_render(self, word_freq, most_common_word):
+        '''
+        Returns the digest of the word cloud image, rendering it only if no tier has it yet.
+        '''
+        digest = self.key(word_freq, most_common_word)
+        if self.get_png(digest) is not None:
+            return digest
+        with self.render_lock(digest):
+            # Another worker or thread may have rendered it while this one waited
+            if self.get_png(digest) is not None:
+                return digest
+            with self.lock:
+                self.misses += 1
+            png = render_wordcloud_png(word_freq, most_common_word, self.width, self.height)
+            # Write to a temporary file first so other workers never read a partial image
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(png)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path(digest))
+        self.prune(keep=digest)
+        self._remember(digest, png)
+        return digest
+
+    @contextmanager
+    def render_lock(self, digest):
+        if fcntl is None:
+            yield
+            return
+        # flock locks belong to the open file, so this excludes other threads as well as other workers
+        path = os.path.join(self.directory, f'{digest}.lock')
+        with open(path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def stats(self):
+        with self.lock:
+            return {'memory_items': len(self.memory), 'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses}